@@ -0,0 +1,4 @@
+# Shared detection, tracking, I/O and analytics code for the task1/task2 pipelines and dashboards.
+# Submodules are imported explicitly (e.g. `from soccer_core.tracker import create_tracker`);
+# heavy dependencies (torch, ultralytics, onnxruntime, scipy, matplotlib) load on first use.
+__version__ = '0.1.0'
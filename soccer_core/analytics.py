@@ -0,0 +1,83 @@
+import io
+import json
+import os
+import numpy as np
+from .utils import iter_tracking_results
+from .track_store import TrackStore
+
+# Dashboard aggregates (appearances per ID, players per frame, per-ID trajectories), computed once
+# per tracking file as flat arrays and cached next to it as <tracking file>.analytics.npz.
+# The cache is keyed by the input's size and mtime, so rewriting the tracking output invalidates it.
+
+def source_key(path):
+    if os.path.isdir(path):
+        stats = [os.stat(os.path.join(path, name)) for name in sorted(os.listdir(path)) if name.endswith('.bin')]
+    else:
+        stats = [os.stat(path)]
+    return json.dumps([[s.st_size, s.st_mtime_ns] for s in stats])
+
+def tracking_table(path):
+    # One row per (frame, track): frame index, track id, centroid; plus the number of players in every frame
+    if os.path.isdir(path):
+        store = TrackStore(path)
+        objects = np.asarray(store.tables['objects'])
+        return objects['frame'].astype(int), objects['track_id'].astype(str), objects['cx'].astype(float), objects['cy'].astype(float), np.asarray(store.frames['obj_count'], dtype=int)
+    frames, ids, xy, per_frame = [], [], [], []
+    for i, frame_data in enumerate(iter_tracking_results(path)):
+        objects = frame_data['objects']
+        per_frame.append(len(objects))
+        frames.extend([frame_data.get('frame', i)] * len(objects))
+        ids.extend(objects.keys())
+        xy.extend(objects.values())
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+    return np.asarray(frames, dtype=int), np.asarray(ids, dtype=str), xy[:, 0], xy[:, 1], np.asarray(per_frame, dtype=int)
+
+def compute_analytics(path):
+    frames, ids, cx, cy, per_frame = tracking_table(path)
+    unique_ids, codes = np.unique(ids, return_inverse=True)
+    # Numeric IDs sort numerically ('2' before '10')
+    if all(i.lstrip('-').isdigit() for i in unique_ids):
+        rank = np.argsort(unique_ids.astype(int), kind='stable')
+        unique_ids = unique_ids[rank]
+        codes = np.argsort(rank)[codes]
+    order = np.lexsort((frames, codes))
+    counts = np.bincount(codes, minlength=len(unique_ids))
+    return {
+        'ids': unique_ids,
+        'counts': counts,
+        'players_per_frame': per_frame,
+        'traj_frame': frames[order],
+        'traj_x': cx[order],
+        'traj_y': cy[order],
+        'traj_offsets': np.concatenate([[0], np.cumsum(counts)]),
+    }
+
+def cache_path(path):
+    return os.path.normpath(path) + '.analytics.npz'
+
+def load_analytics(path):
+    key = source_key(path)
+    cached = cache_path(path)
+    if os.path.exists(cached):
+        try:
+            with np.load(cached) as data:
+                if str(data['key']) == key:
+                    return {name: data[name] for name in data.files if name != 'key'}
+        except (OSError, ValueError, KeyError):
+            pass
+    result = compute_analytics(path)
+    buf = io.BytesIO()
+    np.savez(buf, key=np.array(key), **result)
+    tmp = cached + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(buf.getvalue())
+    os.replace(tmp, cached)
+    return result
+
+def trajectories(analytics):
+    # Yields (track id, frames, (N, 2) centroids) per track, in ID order
+    offsets = analytics['traj_offsets']
+    xy = np.stack([analytics['traj_x'], analytics['traj_y']], axis=1)
+    for i, track_id in enumerate(analytics['ids']):
+        lo, hi = offsets[i], offsets[i + 1]
+        yield str(track_id), analytics['traj_frame'][lo:hi], xy[lo:hi]
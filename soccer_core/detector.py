@@ -0,0 +1,58 @@
+import numpy as np
+
+# torch and ultralytics are imported when a detector is created, not when this module is
+# imported, so tools that only read tracking output never pay for them.
+
+class PlayerDetector:
+    def __init__(self, model_path, imgsz=None):
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+        # Inference size (longest side); None keeps the model's training size
+        self.imgsz = imgsz
+
+    def class_ids(self, label):
+        names = self.model.names
+        return np.array([cls for cls, name in names.items() if name.lower() == label.lower()], dtype=int)
+
+    def detect(self, frame):
+        results = self.model(frame)
+        detections = []
+        for r in results:
+            boxes = r.boxes.cpu().numpy() if hasattr(r, 'boxes') else []
+            for box in boxes:
+                x1, y1, x2, y2 = box.xyxy[0]
+                conf = box.conf[0]
+                cls = int(box.cls[0])
+                label = r.names[cls] if hasattr(r, 'names') else str(cls)
+                detections.append({
+                    'bbox': [float(x1), float(y1), float(x2), float(y2)],
+                    'conf': float(conf),
+                    'cls': cls,
+                    'label': label
+                })
+        return detections
+
+    def detect_batch(self, frames):
+        # One forward pass for the whole chunk; returns (boxes, conf, cls) arrays per frame
+        options = {'imgsz': self.imgsz} if self.imgsz else {}
+        results = self.model(list(frames), verbose=False, **options)
+        batch = []
+        for r in results:
+            boxes = r.boxes.cpu().numpy()
+            batch.append((
+                boxes.xyxy.astype(np.float32).reshape(-1, 4),
+                boxes.conf.astype(np.float32).reshape(-1),
+                boxes.cls.astype(int).reshape(-1),
+            ))
+        return batch
+
+def create_detector(model_path, backend=None, threads=None, imgsz=None):
+    # .onnx weights (or backend='onnx') run on ONNX Runtime, anything else on ultralytics/PyTorch
+    backend = backend or ('onnx' if str(model_path).endswith('.onnx') else 'torch')
+    if backend == 'onnx':
+        from .onnx_detector import OnnxPlayerDetector
+        return OnnxPlayerDetector(model_path, threads=threads, imgsz=imgsz)
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+    return PlayerDetector(model_path, imgsz)
@@ -0,0 +1,29 @@
+import cv2
+import numpy as np
+
+def extract_color_histogram(frame, bbox, bins=(8, 8, 8)):
+    return extract_color_histograms(frame, [bbox], bins)[0]
+
+def clip_boxes(bboxes, width, height):
+    boxes = np.asarray(bboxes, dtype=float).reshape(-1, 4).astype(int)
+    boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, width)
+    boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, height)
+    return boxes
+
+def extract_color_histograms(frame, bboxes, bins=(8, 8, 8), chunk=256):
+    boxes = clip_boxes(bboxes, frame.shape[1], frame.shape[0])
+    hists = np.zeros((len(boxes), int(np.prod(bins))), dtype=np.float32)
+    # Empty, zero-area or fully out-of-frame boxes keep an all-zero histogram
+    valid = np.flatnonzero((boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1]))
+    for start in range(0, len(valid), chunk):
+        rows = valid[start:start + chunk]
+        # Lay the pixels of every box side by side in one strip, convert it once and bin it in a
+        # single calcHist call, with the box index as an extra histogram dimension
+        crops = [frame[boxes[i, 1]:boxes[i, 3], boxes[i, 0]:boxes[i, 2]].reshape(1, -1, 3) for i in rows]
+        hsv = cv2.cvtColor(np.concatenate(crops, axis=1), cv2.COLOR_BGR2HSV)
+        owner = np.repeat(np.arange(len(rows), dtype=np.uint8), [c.shape[1] for c in crops]).reshape(1, -1)
+        hist = cv2.calcHist([owner, hsv], [0, 1, 2, 3], None, [len(rows), *bins], [0, len(rows), 0, 180, 0, 256, 0, 256])
+        hists[rows] = hist.reshape(len(rows), -1)
+    norms = np.linalg.norm(hists, axis=1, keepdims=True)
+    np.divide(hists, norms, out=hists, where=norms > 0)
+    return hists
@@ -0,0 +1,173 @@
+import itertools
+import subprocess
+import threading
+import weakref
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+def keyframe_index(video_path):
+    # Display-order indices of keyframes, read from packet flags (no decoding). None if ffprobe is unavailable.
+    cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_path]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    pts, key = [], []
+    for line in out.splitlines():
+        fields = line.split(',')
+        if len(fields) < 2 or fields[0] in ('', 'N/A'):
+            continue
+        pts.append(float(fields[0]))
+        key.append('K' in fields[1])
+    if not pts:
+        return None
+    order = np.argsort(pts, kind='stable')
+    return np.flatnonzero(np.asarray(key)[order])
+
+class FrameCache:
+    # LRU of decoded frames shared by every FrameSource in the process, keyed by (source token, frame
+    # index), so `budget_bytes` bounds the total however many videos are open at once
+    def __init__(self, budget_bytes=512 << 20):
+        self.budget_bytes = budget_bytes
+        self.frames = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.frames
+
+    def get(self, key):
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.frames.move_to_end(key)
+            return frame
+
+    def put(self, key, frame):
+        with self.lock:
+            if key in self.frames:
+                return
+            self.frames[key] = frame
+            self.nbytes += frame.nbytes
+            while self.nbytes > self.budget_bytes and len(self.frames) > 1:
+                _, old = self.frames.popitem(last=False)
+                self.nbytes -= old.nbytes
+
+    def drop(self, token):
+        with self.lock:
+            for key in [key for key in self.frames if key[0] == token]:
+                self.nbytes -= self.frames.pop(key).nbytes
+
+FRAME_CACHE = FrameCache()
+_tokens = itertools.count()
+
+def _prefetch_loop(ref, wake, stop):
+    # Holds the source only through a weakref between requests, so a source nobody else references
+    # (e.g. evicted from st.cache_resource) can be collected; its finalizer then stops this loop
+    while not stop.is_set():
+        if not wake.wait(timeout=1.0):
+            if ref() is None:
+                return
+            continue
+        wake.clear()
+        source = ref()
+        if source is None or stop.is_set():
+            return
+        source._read_ahead()
+        del source
+
+def _close(cap, lock, cache, token, wake, stop):
+    stop.set()
+    wake.set()
+    with lock:
+        cap.release()
+    cache.drop(token)
+
+class FrameSource:
+    # Random access to decoded frames for the dashboards: one persistent capture, decoded frames in a
+    # process-wide LRU (FRAME_CACHE unless `cache` is given), and background read-ahead past the last
+    # requested frame. With a keyframe index a seek starts at the nearest keyframe at or before the
+    # target, so any frame costs at most one GOP of decoding; without one, short forward jumps decode
+    # forward and anything else falls back to CAP_PROP_POS_FRAMES. close() (or garbage collection)
+    # stops the read-ahead thread, releases the capture and drops this source's cached frames.
+    def __init__(self, video_path, cache=None, read_ahead=16, keyframes=None, max_forward=64):
+        self.video_path = video_path
+        self.cap = cv2.VideoCapture(video_path)
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.cache = cache if cache is not None else FRAME_CACHE
+        self.token = next(_tokens)
+        self.read_ahead = read_ahead
+        self.keyframes = keyframes
+        self.max_forward = max_forward
+        self.pos = 0
+        self.lock = threading.Lock()
+        self._target = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+        self._finalizer = weakref.finalize(self, _close, self.cap, self.lock, self.cache, self.token, self._wake, self._stop)
+
+    def __len__(self):
+        return self.frame_count
+
+    def _seek(self, idx):
+        if self.keyframes is not None and len(self.keyframes):
+            start = int(self.keyframes[max(0, np.searchsorted(self.keyframes, idx, side='right') - 1)])
+            if not start <= self.pos <= idx:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+                self.pos = start
+        elif not self.pos <= idx <= self.pos + self.max_forward:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            self.pos = idx
+        while self.pos < idx:
+            if not self.cap.grab():
+                return False
+            self.pos += 1
+        return True
+
+    def _decode(self, idx):
+        if self._stop.is_set() or not self._seek(idx):
+            return None
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.pos += 1
+        self.cache.put((self.token, idx), frame)
+        return frame
+
+    def get(self, idx):
+        # Returns a copy, so callers can draw on it without touching the cache; None past the end or once closed
+        frame = self.cache.get((self.token, idx))
+        if frame is None:
+            with self.lock:
+                frame = self._decode(idx)
+        if frame is None:
+            return None
+        self._prefetch(idx)
+        return frame.copy()
+
+    def _prefetch(self, idx):
+        if self.read_ahead <= 0 or self._stop.is_set():
+            return
+        self._target = idx
+        if self._worker is None:
+            self._worker = threading.Thread(target=_prefetch_loop, args=(weakref.ref(self), self._wake, self._stop), daemon=True)
+            self._worker.start()
+        self._wake.set()
+
+    def _read_ahead(self):
+        target = self._target
+        for idx in range(target + 1, min(target + 1 + self.read_ahead, self.frame_count)):
+            # A newer request (the slider moved) or close() abandons this read-ahead
+            if self._target != target or self._stop.is_set():
+                break
+            with self.lock:
+                if (self.token, idx) not in self.cache and self._decode(idx) is None:
+                    break
+
+    def close(self):
+        self._finalizer()
+        if self._worker is not None:
+            self._worker.join(timeout=1.0)
@@ -0,0 +1,64 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+MODULES = [
+    'soccer_core.utils',
+    'soccer_core.tracker',
+    'soccer_core.detector',
+    'soccer_core.analytics',
+    'soccer_core.trajectories',
+    'soccer_core.frame_cache',
+    'soccer_core.onnx_detector',
+]
+
+def _run(code, python):
+    t0 = time.perf_counter()
+    subprocess.run([python, '-c', code], check=True)
+    return time.perf_counter() - t0
+
+def time_import(module, repeats=5, python=sys.executable):
+    # Best-of-N wall time of `import module` in a fresh interpreter, minus bare interpreter start-up
+    base = min(_run('pass', python) for _ in range(repeats))
+    return max(0.0, min(_run(f'import {module}', python) for _ in range(repeats)) - base)
+
+def heaviest_imports(module, top=10, python=sys.executable):
+    # (cumulative ms, module) of the slowest top-level imports, from `python -X importtime`
+    err = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'], capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nesting is shown by two spaces per level; keep the direct imports of `module`
+        if name.startswith('   ') and not name.startswith('     '):
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold import time of soccer_core modules (and anything else you pass)')
+    parser.add_argument('--modules', nargs='+', default=MODULES)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help='Also list the N slowest imports behind each module')
+    parser.add_argument('--output', default=None, help='Write results as JSON')
+    args = parser.parse_args()
+    results = []
+    print('| module | import (ms) |')
+    print('|---|---|')
+    for module in args.modules:
+        ms = 1000 * time_import(module, args.repeats)
+        results.append({'module': module, 'import_ms': ms})
+        print(f'| {module} | {ms:.1f} |')
+    if args.top:
+        for r in results:
+            r['heaviest'] = heaviest_imports(r['module'], args.top)
+            print(f"[INFO] {r['module']}: " + ', '.join(f'{name} {ms:.0f}ms' for ms, name in r['heaviest']))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'[INFO] Import benchmark saved to {args.output}')
+
+if __name__ == "__main__":
+    main()
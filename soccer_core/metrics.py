@@ -0,0 +1,143 @@
+import bisect
+import json
+import os
+import time
+
+# Log-spaced latency buckets, 8 per doubling from 10us to ~170s: quantiles are read from bucket
+# counts (within ~9%), so recording a sample is one bisect and one increment.
+BUCKET_BOUNDS = [1e-5 * 2 ** (i / 8) for i in range(8 * 24 + 1)]
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+class StageMetrics:
+    def __init__(self, labels=None):
+        self.labels = labels or {}
+        self.histograms = {}
+        self.totals = {}
+        self.maxima = {}
+        self.queues = {}
+        self.frames = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def time(self, stage):
+        return _Timer(self, stage)
+
+    def observe(self, stage, seconds):
+        # Each stage is only ever recorded from one thread, so plain list updates are enough
+        counts = self.histograms.get(stage)
+        if counts is None:
+            counts = self.histograms[stage] = [0] * (len(BUCKET_BOUNDS) + 1)
+            self.totals[stage] = 0.0
+            self.maxima[stage] = 0.0
+        counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.totals[stage] += seconds
+        if seconds > self.maxima[stage]:
+            self.maxima[stage] = seconds
+
+    def sample_queue(self, name, depth):
+        stats = self.queues.setdefault(name, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += depth
+        stats[2] = max(stats[2], depth)
+
+    def frame(self, n=1):
+        self.frames += n
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def quantile(self, stage, q):
+        counts = self.histograms[stage]
+        target = q * sum(counts)
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= target:
+                lower = BUCKET_BOUNDS[i - 1] if i > 0 else 0.0
+                upper = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.maxima[stage]
+                return min(lower + (upper - lower) * (target - seen) / count, self.maxima[stage])
+            seen += count
+        return 0.0
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        stages = {}
+        for stage, counts in self.histograms.items():
+            n = sum(counts)
+            stages[stage] = {
+                'count': n,
+                'total_s': self.totals[stage],
+                'mean_ms': 1000 * self.totals[stage] / n if n else 0.0,
+                'p50_ms': 1000 * self.quantile(stage, 0.50),
+                'p95_ms': 1000 * self.quantile(stage, 0.95),
+                'p99_ms': 1000 * self.quantile(stage, 0.99),
+                'max_ms': 1000 * self.maxima[stage],
+            }
+        queues = {name: {'samples': n, 'mean': total / n if n else 0.0, 'max': peak} for name, (n, total, peak) in self.queues.items()}
+        return {
+            'labels': self.labels,
+            'frames': self.frames,
+            'elapsed_s': elapsed,
+            'fps': self.frames / elapsed if elapsed else 0.0,
+            'stages': stages,
+            'queues': queues,
+        }
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f'[INFO] Metrics saved to {path}')
+
+    def prometheus_text(self, prefix='soccer'):
+        def label(**extra):
+            pairs = {**self.labels, **extra}
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs.items()) + '}'
+
+        summary = self.summary()
+        lines = [
+            f'# HELP {prefix}_stage_latency_seconds Per-stage latency of the processing loop',
+            f'# TYPE {prefix}_stage_latency_seconds histogram',
+        ]
+        for stage, counts in self.histograms.items():
+            cumulative = 0
+            for i, count in enumerate(counts[:-1]):
+                cumulative += count
+                if i % 8 == 0:
+                    lines.append(f'{prefix}_stage_latency_seconds_bucket{label(stage=stage, le=f"{BUCKET_BOUNDS[i]:.6g}")} {cumulative}')
+            lines.append(f'{prefix}_stage_latency_seconds_bucket{label(stage=stage, le="+Inf")} {sum(counts)}')
+            lines.append(f'{prefix}_stage_latency_seconds_sum{label(stage=stage)} {self.totals[stage]:.6f}')
+            lines.append(f'{prefix}_stage_latency_seconds_count{label(stage=stage)} {sum(counts)}')
+        lines += [f'# TYPE {prefix}_stage_latency_quantile_seconds gauge']
+        for stage, stats in summary['stages'].items():
+            for q, key in ((0.5, 'p50_ms'), (0.95, 'p95_ms'), (0.99, 'p99_ms')):
+                lines.append(f'{prefix}_stage_latency_quantile_seconds{label(stage=stage, quantile=q)} {stats[key] / 1000:.6f}')
+        lines += [f'# TYPE {prefix}_queue_depth gauge']
+        for name, stats in summary['queues'].items():
+            lines.append(f'{prefix}_queue_depth{label(queue=name, stat="mean")} {stats["mean"]:.3f}')
+            lines.append(f'{prefix}_queue_depth{label(queue=name, stat="max")} {stats["max"]}')
+        lines += [
+            f'# TYPE {prefix}_frames_total counter',
+            f'{prefix}_frames_total{label()} {summary["frames"]}',
+            f'# TYPE {prefix}_frames_per_second gauge',
+            f'{prefix}_frames_per_second{label()} {summary["fps"]:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        with open(path, 'w') as f:
+            f.write(self.prometheus_text())
+        print(f'[INFO] Prometheus metrics saved to {path}')
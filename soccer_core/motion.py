@@ -0,0 +1,98 @@
+import cv2
+import numpy as np
+from .tracker import warp_points
+
+MOTION_METHODS = ('lk', 'orb')
+
+def motion_magnitude(H, size):
+    # Mean displacement (pixels) of the frame corners under H: one number for "how much did the camera move"
+    width, height = size
+    corners = np.array([[0, 0], [width, 0], [0, height], [width, height]], dtype=float)
+    return float(np.linalg.norm(warp_points(corners, H) - corners, axis=1).mean())
+
+class GlobalMotionEstimator:
+    # Frame-to-frame camera motion (pan, zoom, small rotation) estimated on a downscaled grey frame.
+    # 'lk' tracks corners with pyramidal Lucas-Kanade, 'orb' matches ORB keypoints (more robust to
+    # large jumps, needs more texture). Both fit a similarity transform (pan, zoom, roll) with RANSAC,
+    # so players moving against the pitch are rejected as outliers; player boxes of the previous
+    # frame passed to estimate() are also masked out.
+    # estimate() returns the 3x3 transform from the previous frame to this one in full-resolution
+    # pixels, or identity with reliable=False when there is not enough texture to trust a fit.
+    def __init__(self, method='lk', width=320, max_features=300, min_inliers=10, max_zoom=0.1):
+        if method not in MOTION_METHODS:
+            raise ValueError(f'Unknown motion method {method!r}; choose from {list(MOTION_METHODS)}')
+        self.method = method
+        self.width = width
+        self.max_features = max_features
+        self.min_inliers = min_inliers
+        self.max_zoom = max_zoom
+        self.previous = None
+        self.reliable = False
+        self.inliers = 0
+        self._orb = None
+
+    def __getstate__(self):
+        # cv2 feature detectors cannot be pickled (tracker checkpoints); they are recreated on demand
+        state = dict(self.__dict__)
+        state['_orb'] = None
+        return state
+
+    def _mask(self, shape, boxes, scale):
+        mask = np.full(shape, 255, dtype=np.uint8)
+        for x1, y1, x2, y2 in (np.asarray(boxes, dtype=float).reshape(-1, 4) * scale).astype(int):
+            mask[max(0, y1):max(0, y2), max(0, x1):max(0, x2)] = 0
+        return mask
+
+    def _fit_lk(self, previous, mask, grey):
+        points = cv2.goodFeaturesToTrack(previous, self.max_features, 0.01, 8, mask=mask)
+        if points is None or len(points) < self.min_inliers:
+            return None, 0
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(previous, grey, points, None, winSize=(21, 21), maxLevel=3)
+        ok = status.reshape(-1) == 1
+        if ok.sum() < self.min_inliers:
+            return None, 0
+        A, inliers = cv2.estimateAffinePartial2D(points[ok], moved[ok], method=cv2.RANSAC, ransacReprojThreshold=2.0)
+        if A is None:
+            return None, 0
+        return np.vstack([A, [0, 0, 1]]), int(inliers.sum())
+
+    def _fit_orb(self, previous, mask, grey):
+        if self._orb is None:
+            self._orb = cv2.ORB_create(self.max_features)
+        kp1, des1 = self._orb.detectAndCompute(previous, mask)
+        kp2, des2 = self._orb.detectAndCompute(grey, None)
+        if des1 is None or des2 is None or len(kp1) < self.min_inliers:
+            return None, 0
+        # Lowe's ratio test: pitch stripes and lines repeat, so ambiguous matches are dropped up front
+        pairs = cv2.BFMatcher(cv2.NORM_HAMMING).knnMatch(des1, des2, k=2)
+        matches = [p[0] for p in pairs if len(p) == 2 and p[0].distance < 0.75 * p[1].distance]
+        if len(matches) < self.min_inliers:
+            return None, 0
+        src = np.float32([kp1[m.queryIdx].pt for m in matches])
+        dst = np.float32([kp2[m.trainIdx].pt for m in matches])
+        A, inliers = cv2.estimateAffinePartial2D(src, dst, method=cv2.RANSAC, ransacReprojThreshold=2.0)
+        if A is None:
+            return None, 0
+        return np.vstack([A, [0, 0, 1]]), int(inliers.sum())
+
+    def _plausible(self, H):
+        # A broadcast camera does not zoom by more than a few percent between frames; a fit that does
+        # is locked onto repeated structure (stripes, lines) rather than the true motion
+        return abs(np.sqrt(abs(np.linalg.det(H[:2, :2]))) - 1) <= self.max_zoom
+
+    def estimate(self, frame, boxes=None):
+        scale = self.width / frame.shape[1]
+        size = (self.width, max(1, int(round(frame.shape[0] * scale))))
+        grey = cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        H, self.inliers = None, 0
+        if self.previous is not None and self.previous.shape == grey.shape:
+            fit = self._fit_lk if self.method == 'lk' else self._fit_orb
+            mask = self._mask(grey.shape, boxes if boxes is not None else [], scale)
+            H, self.inliers = fit(self.previous, mask, grey)
+        self.previous = grey
+        self.reliable = H is not None and self.inliers >= self.min_inliers and self._plausible(H)
+        if not self.reliable:
+            return np.eye(3)
+        # Fitted on the downscaled frame: conjugate by the scale to get full-resolution pixels
+        S = np.diag([scale, scale, 1.0])
+        return np.linalg.inv(S) @ H @ S
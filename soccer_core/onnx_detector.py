@@ -0,0 +1,216 @@
+import argparse
+import ast
+import json
+import os
+import shutil
+import time
+import cv2
+import numpy as np
+
+def export_onnx(model_path, onnx_path=None, imgsz=640, dynamic=True):
+    from ultralytics import YOLO
+    exported = YOLO(model_path).export(format='onnx', imgsz=imgsz, dynamic=dynamic)
+    if onnx_path and os.path.abspath(onnx_path) != os.path.abspath(exported):
+        shutil.move(exported, onnx_path)
+        exported = onnx_path
+    print(f'[INFO] Exported {model_path} to {exported}')
+    return exported
+
+def letterbox(frame, imgsz):
+    # Same geometry as ultralytics LetterBox(auto=False): scale to fit, pad evenly with grey
+    height, width = frame.shape[:2]
+    r = min(imgsz / height, imgsz / width)
+    new_w, new_h = int(round(width * r)), int(round(height * r))
+    dw, dh = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+    if (new_w, new_h) != (width, height):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return frame, r, (left, top)
+
+class VideoCalibrationReader:
+    # Feeds letterboxed frames from a reference clip to onnxruntime static quantization
+    def __init__(self, video_path, input_name, imgsz=640, num_frames=32):
+        cap = cv2.VideoCapture(video_path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or num_frames
+        step = max(1, total // num_frames)
+        self.batches = []
+        for idx in range(0, total, step):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            ret, frame = cap.read()
+            if not ret or len(self.batches) >= num_frames:
+                break
+            self.batches.append({input_name: preprocess([frame], imgsz)[0]})
+        cap.release()
+        self.iterator = iter(self.batches)
+
+    def get_next(self):
+        return next(self.iterator, None)
+
+def quantize_onnx(onnx_path, output_path, mode='dynamic', calibration_video=None, imgsz=640, num_frames=32):
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic, quantize_static
+    if mode == 'dynamic':
+        quantize_dynamic(onnx_path, output_path, weight_type=QuantType.QInt8)
+    elif mode == 'static':
+        if calibration_video is None:
+            raise ValueError('Static quantization needs a calibration video')
+        input_name = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+        reader = VideoCalibrationReader(calibration_video, input_name, imgsz, num_frames)
+        quantize_static(onnx_path, output_path, reader, activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    else:
+        raise ValueError(f'Unknown quantization mode {mode!r}')
+    print(f'[INFO] Quantized ({mode}) model saved to {output_path}')
+    return output_path
+
+def preprocess(frames, imgsz):
+    batch, meta = [], []
+    for frame in frames:
+        padded, r, pad = letterbox(frame, imgsz)
+        batch.append(padded)
+        meta.append((r, pad, frame.shape[:2]))
+    blob = np.stack(batch)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(blob, dtype=np.float32) / 255.0, meta
+
+class OnnxPlayerDetector:
+    # ONNX Runtime CPU engine with the same class_ids / detect / detect_batch interface as PlayerDetector
+    def __init__(self, model_path, threads=None, conf=0.25, iou=0.7, max_det=300, imgsz=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input = self.session.get_inputs()[0]
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+        exported = ast.literal_eval(metadata['imgsz']) if 'imgsz' in metadata else self.input.shape[2:]
+        self.imgsz = int(max(exported))
+        if imgsz:
+            # Dynamic-shape export: any multiple of the 32px stride works; a fixed one only runs at its own size
+            rounded = int(np.ceil(imgsz / 32) * 32)
+            if isinstance(self.input.shape[2], int) and rounded != self.imgsz:
+                raise ValueError(f'{model_path} has a fixed {self.imgsz}px input; re-export with dynamic=True to run at {rounded}px')
+            self.imgsz = rounded
+        self.fixed_batch = self.input.shape[0] if isinstance(self.input.shape[0], int) else None
+        self.conf = conf
+        self.iou = iou
+        self.max_det = max_det
+
+    def class_ids(self, label):
+        return np.array([cls for cls, name in self.names.items() if name.lower() == label.lower()], dtype=int)
+
+    def detect(self, frame):
+        boxes, conf, cls = self.detect_batch([frame])[0]
+        return [{
+            'bbox': [float(v) for v in box],
+            'conf': float(c),
+            'cls': int(k),
+            'label': self.names.get(int(k), str(int(k)))
+        } for box, c, k in zip(boxes, conf, cls)]
+
+    def detect_batch(self, frames):
+        frames = list(frames)
+        if not frames:
+            return []
+        blob, meta = preprocess(frames, self.imgsz)
+        step = self.fixed_batch or len(frames)
+        preds = np.concatenate([self.session.run(None, {self.input.name: blob[i:i + step]})[0] for i in range(0, len(frames), step)])
+        return [self.postprocess(p, m) for p, m in zip(preds, meta)]
+
+    def postprocess(self, pred, meta):
+        r, (left, top), (height, width) = meta
+        pred = pred.T
+        scores = pred[:, 4:]
+        cls = scores.argmax(axis=1)
+        conf = scores[np.arange(len(cls)), cls]
+        keep = conf > self.conf
+        xywh, conf, cls = pred[keep, :4], conf[keep], cls[keep]
+        xyxy = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2], axis=1)
+        if len(xyxy):
+            tlwh = np.concatenate([xyxy[:, :2], xywh[:, 2:]], axis=1)
+            idx = np.asarray(cv2.dnn.NMSBoxesBatched(tlwh.tolist(), conf.tolist(), cls.tolist(), self.conf, self.iou), dtype=int).reshape(-1)
+            idx = idx[np.argsort(-conf[idx])][:self.max_det]
+            xyxy, conf, cls = xyxy[idx], conf[idx], cls[idx]
+        xyxy = (xyxy - [left, top, left, top]) / r
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, width)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, height)
+        return xyxy.astype(np.float32).reshape(-1, 4), conf.astype(np.float32), cls.astype(int)
+
+def box_iou(a, b):
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+def compare_backends(model_paths, video_path, num_frames=100, batch_size=1, threads=None, iou_threshold=0.5):
+    # Accuracy is measured against the first model's detections on the same frames
+    from .detector import create_detector
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < num_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    outputs, report = {}, []
+    for model_path in model_paths:
+        detector = create_detector(model_path, threads=threads)
+        detector.detect_batch(frames[:1])
+        start = time.perf_counter()
+        outputs[model_path] = [d for i in range(0, len(frames), batch_size) for d in detector.detect_batch(frames[i:i + batch_size])]
+        elapsed = time.perf_counter() - start
+        report.append({'model': model_path, 'fps': len(frames) / elapsed, 'ms_per_frame': 1000 * elapsed / len(frames)})
+    reference = outputs[model_paths[0]]
+    for row in report:
+        matched, n_ref, n_pred, ious = 0, 0, 0, []
+        for (ref_boxes, _, ref_cls), (boxes, _, cls) in zip(reference, outputs[row['model']]):
+            n_ref += len(ref_boxes)
+            n_pred += len(boxes)
+            if len(ref_boxes) and len(boxes):
+                iou = box_iou(ref_boxes, boxes) * (ref_cls[:, None] == cls[None, :])
+                best = iou.max(axis=1)
+                matched += int((best >= iou_threshold).sum())
+                ious.extend(best[best >= iou_threshold].tolist())
+        row['recall'] = matched / n_ref if n_ref else 1.0
+        row['precision'] = matched / n_pred if n_pred else 1.0
+        row['mean_iou'] = float(np.mean(ious)) if ious else 0.0
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Export, quantize and compare ONNX Runtime detector backends')
+    sub = parser.add_subparsers(dest='command', required=True)
+    export = sub.add_parser('export', help='Export a .pt model to ONNX, optionally quantized to INT8')
+    export.add_argument('--model', default=os.path.join('models', 'best.pt'))
+    export.add_argument('--output', default=None)
+    export.add_argument('--imgsz', type=int, default=640)
+    export.add_argument('--quantize', choices=['none', 'dynamic', 'static'], default='none')
+    export.add_argument('--calibration-video', default=None, help='Reference clip for static quantization')
+    compare = sub.add_parser('compare', help='Accuracy-vs-speed report for several models on a reference clip')
+    compare.add_argument('models', nargs='+', help='Model files; the first one is the accuracy reference')
+    compare.add_argument('--video', required=True)
+    compare.add_argument('--frames', type=int, default=100)
+    compare.add_argument('--batch-size', type=int, default=1)
+    compare.add_argument('--threads', type=int, default=None)
+    compare.add_argument('--report', default=None, help='Also write the report as JSON')
+    args = parser.parse_args()
+    if args.command == 'export':
+        onnx_path = export_onnx(args.model, args.output, args.imgsz)
+        if args.quantize != 'none':
+            quantize_onnx(onnx_path, os.path.splitext(onnx_path)[0] + f'_int8_{args.quantize}.onnx', args.quantize, args.calibration_video, args.imgsz)
+    else:
+        report = compare_backends(args.models, args.video, args.frames, args.batch_size, args.threads)
+        print('| model | ms/frame | fps | recall | precision | mean IoU |')
+        print('|---|---|---|---|---|---|')
+        for row in report:
+            print(f"| {os.path.basename(row['model'])} | {row['ms_per_frame']:.1f} | {row['fps']:.1f} | {row['recall']:.3f} | {row['precision']:.3f} | {row['mean_iou']:.3f} |")
+        if args.report:
+            with open(args.report, 'w') as f:
+                json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
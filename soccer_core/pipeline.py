@@ -0,0 +1,80 @@
+import queue
+import threading
+
+_DONE = object()
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+def run_sequential(source, process, sink):
+    for item in source:
+        sink(process(item))
+
+def run_pipelined(source, process, sink, queue_size=4, metrics=None):
+    # decoder thread -> process (calling thread) -> sink thread, joined by bounded FIFO queues.
+    # A full queue blocks the upstream stage (backpressure); one thread per stage keeps frame order.
+    decoded = queue.Queue(maxsize=queue_size)
+    processed = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+
+    def decode():
+        try:
+            for item in source:
+                if not _put(decoded, item, stop):
+                    return
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(decoded, _DONE, stop)
+
+    def encode():
+        try:
+            while True:
+                item = _get(processed, stop)
+                if item is _DONE:
+                    return
+                sink(item)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    decoder = threading.Thread(target=decode, name='decode', daemon=True)
+    encoder = threading.Thread(target=encode, name='encode', daemon=True)
+    decoder.start()
+    encoder.start()
+    try:
+        while True:
+            item = _get(decoded, stop)
+            if item is _DONE:
+                break
+            if metrics is not None:
+                metrics.sample_queue('decoded', decoded.qsize())
+                metrics.sample_queue('processed', processed.qsize())
+            if not _put(processed, process(item), stop):
+                break
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        _put(processed, _DONE, stop)
+        encoder.join()
+        stop.set()
+        decoder.join()
+    if errors:
+        raise errors[0]
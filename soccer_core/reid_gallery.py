@@ -0,0 +1,125 @@
+import numpy as np
+from .feature_extractor import extract_color_histograms
+from .tracker import match_centroids
+
+def _unit(x):
+    return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12)
+
+class ReIDGallery:
+    # Fixed-size gallery of unit-norm appearance embeddings for tracks that have been dropped.
+    # Lookups are two-stage: one matrix product on a pooled `coarse_dim` copy of every embedding
+    # picks `candidates` per query, which are then re-ranked on the full embedding. That keeps a
+    # lookup well under a millisecond with thousands of entries. Entries expire after `ttl` frames,
+    # and when the gallery is full the oldest one is overwritten.
+    def __init__(self, dim=512, capacity=4096, ttl=None, min_similarity=0.85, coarse_dim=64, candidates=8):
+        self.embeddings = np.zeros((capacity, dim), dtype=np.float32)
+        self.coarse = np.zeros((capacity, coarse_dim), dtype=np.float32)
+        self.ids = np.full(capacity, -1, dtype=int)
+        self.stamps = np.full(capacity, -1, dtype=int)
+        self.size = 0
+        self.ttl = ttl
+        self.min_similarity = min_similarity
+        self.candidates = candidates
+
+    def __len__(self):
+        return int((self.ids[:self.size] >= 0).sum())
+
+    def _pool(self, x):
+        # For an 8x8x8 HSV histogram this sums over V, leaving an 8x8 hue/saturation histogram
+        return _unit(x.reshape(len(x), self.coarse.shape[1], -1).sum(2))
+
+    def add(self, track_id, embedding, stamp):
+        # Free slots carry stamp -1, so argmin picks a free slot first and the oldest entry otherwise
+        slot = int(np.argmin(self.stamps[:self.size + 1] if self.size < len(self.ids) else self.stamps))
+        embedding = _unit(np.asarray(embedding, dtype=np.float32).reshape(1, -1))
+        self.embeddings[slot] = embedding
+        self.coarse[slot] = self._pool(embedding)
+        self.ids[slot] = track_id
+        self.stamps[slot] = stamp
+        self.size = max(self.size, slot + 1)
+
+    def expire(self, now):
+        if self.ttl is None:
+            return
+        old = (self.ids[:self.size] >= 0) & (now - self.stamps[:self.size] > self.ttl)
+        self.ids[:self.size][old] = -1
+        self.stamps[:self.size][old] = -1
+
+    def query(self, embeddings):
+        # Returns candidate slots and their cosine similarity, both (n_queries, k); empty slots score -inf
+        queries = _unit(np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), self.embeddings.shape[1]))
+        k = min(self.candidates, self.size)
+        if k == 0 or len(queries) == 0:
+            return np.zeros((len(queries), 0), dtype=int), np.zeros((len(queries), 0), dtype=np.float32)
+        coarse = self.coarse[:self.size] @ self._pool(queries).T
+        coarse[self.ids[:self.size] < 0] = -np.inf
+        slots = np.argpartition(-coarse, k - 1, axis=0)[:k].T
+        sims = np.einsum('nd,nkd->nk', queries, self.embeddings[slots])
+        sims[self.ids[slots] < 0] = -np.inf
+        return slots, sims
+
+    def claim(self, embeddings):
+        # Best gallery entry for each query above min_similarity, each entry claimed at most once.
+        # Claimed entries leave the gallery; returns the reclaimed track id per query, or -1.
+        slots, sims = self.query(embeddings)
+        result = np.full(len(slots), -1, dtype=int)
+        rows, cols = np.nonzero(sims >= self.min_similarity)
+        for k in np.argsort(-sims[rows, cols]):
+            row, slot = rows[k], slots[rows[k], cols[k]]
+            if result[row] >= 0 or self.ids[slot] < 0:
+                continue
+            result[row] = self.ids[slot]
+            self.ids[slot] = -1
+            self.stamps[slot] = -1
+        return result
+
+class ReIDTracker:
+    # Wraps a tracker: tracks it drops go into the gallery with their appearance, and a new track
+    # that matches a gallery entry is reported under the old ID instead of a fresh one.
+    def __init__(self, tracker, gallery=None, alpha=0.2):
+        self.tracker = tracker
+        self.gallery = gallery if gallery is not None else ReIDGallery()
+        self.alpha = alpha
+        self.aliases = {}
+        self.embeddings = {}
+        self.clock = 0
+
+    def __getattr__(self, name):
+        # Everything else (uncertainty, boxes, ...) comes from the wrapped tracker
+        tracker = self.__dict__.get('tracker')
+        if tracker is None:
+            raise AttributeError(name)
+        attr = getattr(tracker, name)
+        if name == 'predict':
+            return lambda: self._public(attr())
+        return attr
+
+    def _public(self, objects):
+        return {self.aliases.get(oid, oid): c for oid, c in objects.items()}
+
+    def update(self, detections, frame):
+        self.clock += 1
+        self.gallery.expire(self.clock)
+        boxes = np.asarray(detections, dtype=float).reshape(-1, 4)
+        objects = dict(self.tracker.update(detections))
+        for oid in [oid for oid in self.embeddings if oid not in objects]:
+            self.gallery.add(self.aliases.pop(oid, oid), self.embeddings.pop(oid), self.clock)
+        if len(objects) and len(boxes):
+            ids = list(objects)
+            rows, cols = match_centroids(np.array([objects[oid] for oid in ids], dtype=float), (boxes[:, :2] + boxes[:, 2:]) / 2)
+            hists = extract_color_histograms(frame, boxes[cols])
+            new = []
+            for row, hist in zip(rows, hists):
+                oid = ids[row]
+                if not hist.any():
+                    continue
+                if oid in self.embeddings:
+                    self.embeddings[oid] += self.alpha * (hist - self.embeddings[oid])
+                else:
+                    self.embeddings[oid] = hist.astype(np.float32)
+                    new.append(oid)
+            if new and len(self.gallery):
+                for oid, old_id in zip(new, self.gallery.claim([self.embeddings[oid] for oid in new])):
+                    if old_id >= 0:
+                        self.aliases[oid] = int(old_id)
+        return self._public(objects)
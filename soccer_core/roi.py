@@ -0,0 +1,169 @@
+import cv2
+import numpy as np
+
+# Green-dominant HSV range of the pitch (OpenCV hue is 0-180)
+PITCH_HSV_LOWER = (35, 40, 40)
+PITCH_HSV_UPPER = (85, 255, 255)
+
+def green_mask(frame, width=320):
+    # Binary green mask of a downscaled copy of the frame; returns the mask and the downscale factor
+    scale = width / frame.shape[1]
+    small = cv2.resize(frame, (width, max(1, int(round(frame.shape[0] * scale)))), interpolation=cv2.INTER_AREA)
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    return cv2.inRange(hsv, PITCH_HSV_LOWER, PITCH_HSV_UPPER), scale
+
+def pitch_hull(mask, min_fraction=0.1):
+    # Convex hull of the largest green region, filled; players and lines inside the pitch leave holes
+    # in the raw mask that the hull closes. None when there is too little green to trust.
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(mask)
+    if n < 2:
+        return None
+    largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    if stats[largest, cv2.CC_STAT_AREA] < min_fraction * mask.size:
+        return None
+    points = cv2.findNonZero((labels == largest).astype(np.uint8))
+    hull = np.zeros_like(mask)
+    cv2.fillConvexPoly(hull, cv2.convexHull(points), 255)
+    return hull
+
+def plan_tiles(roi, tile, overlap=0.2, far_fraction=0.4):
+    # Square tiles covering the top far_fraction of the ROI, where distant players are smallest
+    x0, y0, x1, y1 = roi
+    band = int(round((y1 - y0) * far_fraction))
+    if band <= 0 or tile <= 0 or (x1 - x0 <= tile and y1 - y0 <= tile):
+        return []
+    stride = max(1, int(tile * (1 - overlap)))
+
+    def starts(lo, hi):
+        if hi - lo <= tile:
+            return [lo]
+        count = int(np.ceil((hi - lo - tile) / stride)) + 1
+        return [int(round(v)) for v in np.linspace(lo, hi - tile, count)]
+    bottom = min(y1, y0 + max(band, tile))
+    return [(x, y, min(x + tile, x1), min(y + tile, y1)) for y in starts(y0, bottom) for x in starts(x0, x1)]
+
+def merge_boxes(boxes, conf, cls, threshold=0.6):
+    # Greedy per-class suppression on intersection over the smaller box, so a player cut by a tile
+    # edge is absorbed by the whole-body box from the ROI pass or the neighbouring tile
+    order = np.argsort(-conf)
+    boxes, conf, cls = boxes[order], conf[order], cls[order]
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = np.ones(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if not keep[i]:
+            continue
+        rest = np.flatnonzero(keep[i + 1:]) + i + 1
+        rest = rest[cls[rest] == cls[i]]
+        if not len(rest):
+            continue
+        lt = np.maximum(boxes[i, :2], boxes[rest, :2])
+        rb = np.minimum(boxes[i, 2:], boxes[rest, 2:])
+        inter = np.prod(np.clip(rb - lt, 0, None), axis=1)
+        smaller = np.maximum(np.minimum(area[i], area[rest]), 1e-6)
+        keep[rest[inter / smaller > threshold]] = False
+    return boxes[keep], conf[keep], cls[keep]
+
+class RoiDetector:
+    # Wraps a detector with the same class_ids / detect_batch interface and runs it only on the pitch:
+    # each frame is cropped to the bounding box of the pitch mask, optionally plus native-resolution
+    # tiles over the far side of the pitch, and boxes are mapped back to full-frame coordinates.
+    # The mask is voted over the first sample_frames frames and re-estimated every refresh_every frames
+    # seen by the detector (so it suits fixed or slowly moving cameras). Frames without a usable
+    # green region are passed through whole.
+    def __init__(self, detector, refresh_every=250, sample_frames=5, margin=32, far_fraction=0.0, tile=None, overlap=0.2, filter_outside=True):
+        self.detector = detector
+        self.refresh_every = refresh_every
+        self.sample_frames = sample_frames
+        self.margin = margin
+        self.far_fraction = far_fraction
+        self.tile = tile or getattr(detector, 'imgsz', None) or 640
+        self.overlap = overlap
+        self.filter_outside = filter_outside
+        self.clock = 0
+        self.votes = None
+        self.count = 0
+        self.mask = None
+        self.scale = None
+        self.roi = None
+        self.tiles = []
+        self.stats = {'frames': 0, 'pixels': 0, 'full_pixels': 0}
+
+    def class_ids(self, label):
+        return self.detector.class_ids(label)
+
+    def observe(self, frame):
+        if self.refresh_every and self.clock % self.refresh_every == 0:
+            self.votes, self.count = None, 0
+        self.clock += 1
+        if self.count >= self.sample_frames:
+            return
+        mask, scale = green_mask(frame)
+        self.votes = mask.astype(np.float32) / 255 if self.votes is None else self.votes + mask.astype(np.float32) / 255
+        self.count += 1
+        hull = pitch_hull(((self.votes / self.count) >= 0.5).astype(np.uint8) * 255)
+        height, width = frame.shape[:2]
+        if hull is None:
+            self.mask, self.roi, self.tiles = None, (0, 0, width, height), []
+            return
+        grow = max(1, int(round(self.margin * scale)))
+        self.mask = cv2.dilate(hull, np.ones((2 * grow + 1, 2 * grow + 1), np.uint8))
+        self.scale = scale
+        x, y, w, h = cv2.boundingRect(self.mask)
+        self.roi = (max(0, int(x / scale)), max(0, int(y / scale)), min(width, int(np.ceil((x + w) / scale))), min(height, int(np.ceil((y + h) / scale))))
+        self.tiles = []
+        for x0, y0, x1, y1 in plan_tiles(self.roi, self.tile, self.overlap, self.far_fraction) if self.far_fraction > 0 else []:
+            # Skip tiles that are (almost) all stands, e.g. the corners above a perspective-narrowed far touchline
+            if self.mask[int(y0 * scale):int(np.ceil(y1 * scale)), int(x0 * scale):int(np.ceil(x1 * scale))].mean() > 0.1 * 255:
+                self.tiles.append((x0, y0, x1, y1))
+
+    def detect_batch(self, frames):
+        frames = list(frames)
+        crops, owners = [], []
+        for k, frame in enumerate(frames):
+            self.observe(frame)
+            regions = [self.roi] + self.tiles
+            for i, (x0, y0, x1, y1) in enumerate(regions):
+                crops.append(frame[y0:y1, x0:x1])
+                owners.append((k, (x0, y0, x1, y1), self.roi if i else None))
+            self.stats['frames'] += 1
+            self.stats['pixels'] += sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions)
+            self.stats['full_pixels'] += frame.shape[0] * frame.shape[1]
+        parts = [[] for _ in frames]
+        for (k, (x0, y0, x1, y1), roi), (boxes, conf, cls) in zip(owners, self.detector.detect_batch(crops)):
+            boxes = boxes + np.array([x0, y0, x0, y0], dtype=np.float32)
+            if roi is not None:
+                # Tile boxes touching an inner tile edge are cut off; the overlap or the ROI pass has them whole
+                cut = ((boxes[:, 0] <= x0 + 1) & (x0 > roi[0])) | ((boxes[:, 1] <= y0 + 1) & (y0 > roi[1])) | \
+                      ((boxes[:, 2] >= x1 - 1) & (x1 < roi[2])) | ((boxes[:, 3] >= y1 - 1) & (y1 < roi[3]))
+                boxes, conf, cls = boxes[~cut], conf[~cut], cls[~cut]
+            parts[k].append((boxes, conf, cls))
+        batch = []
+        for part in parts:
+            boxes = np.concatenate([p[0] for p in part]).reshape(-1, 4).astype(np.float32)
+            conf = np.concatenate([p[1] for p in part]).astype(np.float32)
+            cls = np.concatenate([p[2] for p in part]).astype(int)
+            if len(part) > 1 and len(boxes):
+                boxes, conf, cls = merge_boxes(boxes, conf, cls)
+            if self.filter_outside and self.mask is not None and len(boxes):
+                # Keep boxes whose foot point is on the (dilated) pitch: drops spectators and staff in the stands
+                fx = np.clip(((boxes[:, 0] + boxes[:, 2]) / 2 * self.scale).astype(int), 0, self.mask.shape[1] - 1)
+                fy = np.clip((boxes[:, 3] * self.scale).astype(int), 0, self.mask.shape[0] - 1)
+                on_pitch = self.mask[fy, fx] > 0
+                boxes, conf, cls = boxes[on_pitch], conf[on_pitch], cls[on_pitch]
+            batch.append((boxes, conf, cls))
+        return batch
+
+    STATE = ('clock', 'votes', 'count', 'mask', 'scale', 'roi', 'tiles', 'stats')
+
+    def state(self):
+        # Mask voting state for checkpoints; the wrapped detector (the model) is not part of it
+        return {name: getattr(self, name) for name in self.STATE}
+
+    def load_state(self, state):
+        for name in self.STATE:
+            setattr(self, name, state[name])
+
+    def pixel_ratio(self):
+        # Share of full-frame pixels actually sent to the detector (tiles included)
+        return self.stats['pixels'] / max(1, self.stats['full_pixels'])
@@ -0,0 +1,284 @@
+import argparse
+import collections
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+import cv2
+import numpy as np
+from .metrics import StageMetrics
+from .utils import tracking_record
+
+# Sources cv2.VideoCapture opens through its FFmpeg backend (UDP/RTP/RTSP stand-ins for a live feed)
+NETWORK_SCHEMES = ('udp://', 'rtp://', 'rtsp://', 'tcp://', 'srt://', 'http://', 'https://')
+
+def capture_frames(cap, realtime=False):
+    # realtime paces a finished file at its own frame rate, so it behaves like a live camera
+    interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 25.0) if realtime else 0.0
+    next_due = time.monotonic()
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            if interval:
+                next_due += interval
+                time.sleep(max(0.0, next_due - time.monotonic()))
+            yield frame
+    finally:
+        cap.release()
+
+def raw_frames(stream, size):
+    # Fixed-size bgr24 frames from a byte stream, e.g. `ffmpeg ... -f rawvideo -pix_fmt bgr24 -`
+    width, height = size
+    frame_bytes = width * height * 3
+    while True:
+        data = stream.read(frame_bytes)
+        if len(data) < frame_bytes:
+            return
+        yield np.frombuffer(data, np.uint8).reshape(height, width, 3)
+
+def probe_size(path, timeout=10.0):
+    # A file that is still being written may not have its header yet; keep trying for a while
+    deadline = time.monotonic() + timeout
+    while True:
+        cap = cv2.VideoCapture(path)
+        size = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        if min(size) > 0:
+            return size
+        if time.monotonic() > deadline:
+            raise ValueError(f'Could not read the video size of {path}')
+        time.sleep(0.2)
+
+def follow_frames(path, size=None, idle_timeout=10.0):
+    # Decodes a file that is still growing (a recording in progress, e.g. .ts/.mkv/fragmented .mp4):
+    # ffmpeg's -follow keeps reading at EOF and waits for more data instead of stopping; the stream
+    # ends once the file has not grown for idle_timeout seconds
+    size = size or probe_size(path)
+    cmd = ['ffmpeg', '-nostdin', '-loglevel', 'error', '-follow', '1', '-rw_timeout', str(int(idle_timeout * 1e6)), '-i', path, '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{size[0]}x{size[1]}', '-']
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    try:
+        yield from raw_frames(proc.stdout, size)
+    finally:
+        proc.kill()
+        proc.wait()
+
+def open_frame_source(spec, size=None, follow=False, realtime=False, idle_timeout=10.0):
+    # '-' reads raw bgr24 frames from stdin (needs size), network URLs go through cv2/FFmpeg,
+    # follow=True tails a growing file, anything else is a finished file or device
+    if spec == '-':
+        if size is None:
+            raise ValueError('Raw frames on stdin need --size WxH')
+        return raw_frames(sys.stdin.buffer, size)
+    if follow:
+        return follow_frames(spec, size, idle_timeout)
+    if spec.startswith(NETWORK_SCHEMES):
+        return capture_frames(cv2.VideoCapture(spec, cv2.CAP_FFMPEG))
+    cap = cv2.VideoCapture(int(spec) if spec.isdigit() else spec)
+    if not cap.isOpened():
+        raise ValueError(f'Could not open {spec}')
+    return capture_frames(cap, realtime)
+
+class DropOldestQueue:
+    # Bounded hand-off from the reader to the processing loop. put() never blocks the reader: when
+    # the queue is full the oldest frame is discarded, so what is waiting is always the freshest.
+    def __init__(self, maxsize=2):
+        self.items = collections.deque()
+        self.maxsize = maxsize
+        self.cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self.cond:
+            if len(self.items) >= self.maxsize:
+                self.items.popleft()
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+
+    def get(self):
+        # Next item, or None once the source is closed and drained
+        with self.cond:
+            while not self.items and not self.closed:
+                self.cond.wait()
+            return self.items.popleft() if self.items else None
+
+    def __len__(self):
+        return len(self.items)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+class JsonlEmitter:
+    # One JSON record per line, flushed per frame so a consumer tailing the file sees it immediately
+    def __init__(self, path):
+        self.path = path
+        self.file = sys.stdout if path == '-' else open(path, 'w')
+
+    def emit(self, record):
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+class UdpEmitter:
+    # One JSON datagram per frame: fire-and-forget, never blocks the pipeline on a slow consumer
+    def __init__(self, host, port):
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def emit(self, record):
+        try:
+            self.sock.sendto(json.dumps(record).encode(), self.address)
+        except OSError:
+            pass
+
+    def close(self):
+        self.sock.close()
+
+def open_emitter(spec):
+    if spec.startswith('udp://'):
+        host, _, port = spec[len('udp://'):].rpartition(':')
+        return UdpEmitter(host or '127.0.0.1', int(port))
+    return JsonlEmitter(spec)
+
+def run_stream(frames, detector, tracker, emit, player_cls, budget=0.2, queue_size=2, metrics=None, motion=None):
+    # Reader thread -> drop-oldest queue -> detect + track + emit on the calling thread.
+    # Latency is measured from the moment a frame is read off the source to the moment its result
+    # is emitted. A frame is skipped when it is already too old to make the budget given recent
+    # processing times and a newer frame is waiting; with a motion-model tracker the skipped frame
+    # is still emitted from the tracker's prediction, flagged "predicted". With a motion estimator
+    # the tracks are moved with the camera on every frame, skipped ones included.
+    metrics = metrics or StageMetrics()
+    pending = DropOldestQueue(queue_size)
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        try:
+            for frame_idx, frame in enumerate(frames):
+                if stop.is_set():
+                    return
+                pending.put((frame_idx, time.monotonic(), time.time(), frame))
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            pending.close()
+
+    reader = threading.Thread(target=read, name='read', daemon=True)
+    reader.start()
+    predicts = hasattr(tracker, 'predict')
+    processing = None
+    skipped = 0
+    last_boxes = None
+    try:
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            frame_idx, captured, wall, frame = item
+            metrics.sample_queue('pending', len(pending))
+            if motion is not None:
+                with metrics.time('motion'):
+                    tracker.warp(motion.estimate(frame, last_boxes))
+            late = processing is not None and time.monotonic() - captured + processing > budget
+            if late and len(pending):
+                skipped += 1
+                if predicts:
+                    with metrics.time('predict'):
+                        objects, last_boxes = dict(tracker.predict()), tracker.boxes()
+                    emit(dict(tracking_record(frame_idx, objects, last_boxes), ts=wall, latency_ms=1000 * (time.monotonic() - captured), dropped=pending.dropped + skipped, predicted=True))
+                continue
+            started = time.monotonic()
+            with metrics.time('detect'):
+                boxes, conf, cls = detector.detect_batch([frame])[0]
+            is_player = np.isin(cls, player_cls)
+            boxes = last_boxes = boxes[is_player]
+            with metrics.time('track'):
+                objects = dict(tracker.update(boxes))
+            record = tracking_record(frame_idx, objects, boxes)
+            now = time.monotonic()
+            # Smoothed per-frame processing time, used to predict whether the next frame can make the budget
+            processing = now - started if processing is None else 0.8 * processing + 0.2 * (now - started)
+            latency = now - captured
+            metrics.observe('latency', latency)
+            record.update(ts=wall, latency_ms=1000 * latency, dropped=pending.dropped + skipped)
+            with metrics.time('emit'):
+                emit(record)
+            metrics.frame()
+    finally:
+        stop.set()
+        pending.close()
+        reader.join(timeout=1.0)
+        metrics.finish()
+    if errors:
+        raise errors[0]
+    return {'processed': metrics.frames, 'skipped': skipped, 'dropped': pending.dropped}
+
+def parse_size(text):
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+def main():
+    from .detector import create_detector
+    from .motion import MOTION_METHODS, GlobalMotionEstimator
+    from .roi import RoiDetector
+    from .tracker import create_tracker
+    parser = argparse.ArgumentParser(description='Track players on a live or growing video source and stream results per frame')
+    parser.add_argument('source', help="Video file, camera index, network URL (udp://, rtsp://, ...), or '-' for raw bgr24 frames on stdin")
+    parser.add_argument('--size', type=parse_size, default=None, help='Frame size WxH for raw stdin frames (or to skip probing with --follow)')
+    parser.add_argument('--follow', action='store_true', help='Source is a file still being written; keep reading as it grows')
+    parser.add_argument('--idle-timeout', type=float, default=10.0, help='With --follow, end the stream once the file has not grown for this many seconds')
+    parser.add_argument('--realtime', action='store_true', help='Play a finished file at its frame rate, as a live-camera stand-in')
+    parser.add_argument('--model', default='models/best.pt', help='Detector weights (.pt, or .onnx for ONNX Runtime)')
+    parser.add_argument('--backend', choices=['torch', 'onnx'], default=None, help='Detector backend (default: from the model file extension)')
+    parser.add_argument('--detector-threads', type=int, default=None, help='Intra-op threads for the detector')
+    parser.add_argument('--imgsz', type=int, default=None, help='Detector input size (longest side)')
+    parser.add_argument('--roi', action='store_true', help='Run the detector only on the pitch region')
+    parser.add_argument('--tracker', choices=['centroid', 'hungarian', 'kalman'], default='kalman', help='Tracker backend; kalman keeps emitting predicted positions for skipped frames')
+    parser.add_argument('--max-distance', type=float, default=None, help='Gate for the hungarian/kalman trackers: max centroid jump in pixels')
+    parser.add_argument('--motion', choices=MOTION_METHODS, default=None, help='Compensate camera pans/zooms by moving the tracks with the estimated global motion before association')
+    parser.add_argument('--emit', default='-', help="Where per-frame results go: a JSON Lines path, '-' for stdout, or udp://host:port")
+    parser.add_argument('--budget-ms', type=float, default=200.0, help='Latency budget from frame arrival to emitted result; older frames are skipped while newer ones wait')
+    parser.add_argument('--queue-size', type=int, default=2, help='Frames buffered between reader and processing; when full the oldest is dropped')
+    parser.add_argument('--metrics', default=None, help='Write latency percentiles, stage timings and drop counts to this JSON file')
+    parser.add_argument('--warmup', type=int, default=1, help='Dummy detector batches before the stream opens, so the first frames are not late')
+    args = parser.parse_args()
+
+    from .warmup import preload_modules, warmup_detector
+    # The trackers' scipy imports would otherwise land on the first frames
+    preload_modules(('scipy.optimize', 'scipy.spatial'), background=False)
+    detector = create_detector(args.model, args.backend, args.detector_threads, args.imgsz)
+    if args.warmup:
+        warmup_detector(detector, runs=args.warmup)
+    if args.roi:
+        detector = RoiDetector(detector)
+    tracker = create_tracker(args.tracker, max_disappeared=15, max_distance=args.max_distance)
+    emitter = open_emitter(args.emit)
+    metrics = StageMetrics({'source': args.source})
+    try:
+        frames = open_frame_source(args.source, args.size, args.follow, args.realtime, args.idle_timeout)
+        stats = run_stream(frames, detector, tracker, emitter.emit, detector.class_ids('player'), args.budget_ms / 1000, args.queue_size, metrics,
+                           GlobalMotionEstimator(args.motion) if args.motion else None)
+    finally:
+        emitter.close()
+    summary = metrics.summary()
+    latency = summary['stages'].get('latency', {})
+    print(f"[INFO] {stats['processed']} frames processed, {stats['skipped']} skipped to meet the budget, {stats['dropped']} dropped by the reader; "
+          f"latency p50 {latency.get('p50_ms', 0):.0f} ms, p99 {latency.get('p99_ms', 0):.0f} ms (budget {args.budget_ms:.0f} ms)", file=sys.stderr)
+    if args.metrics:
+        summary.update(stats)
+        with open(args.metrics, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f'[INFO] Metrics saved to {args.metrics}', file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
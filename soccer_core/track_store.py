@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import numpy as np
+from .utils import iter_tracking_results, save_tracking_results
+
+# Columnar tracking store: a directory of flat little-endian record files plus meta.json.
+# frames.bin indexes each frame's rows in objects.bin / boxes.bin, so any frame range or
+# track can be read through np.memmap without loading the whole match.
+FRAME_DTYPE = np.dtype([('frame', '<i4'), ('obj_start', '<i8'), ('obj_count', '<i4'), ('box_start', '<i8'), ('box_count', '<i4')])
+OBJECT_DTYPE = np.dtype([('frame', '<i4'), ('track_id', '<i4'), ('cx', '<i4'), ('cy', '<i4')])
+BOX_DTYPE = np.dtype([('frame', '<i4'), ('x1', '<i4'), ('y1', '<i4'), ('x2', '<i4'), ('y2', '<i4'), ('conf', '<f4')])
+TABLES = {'frames': FRAME_DTYPE, 'objects': OBJECT_DTYPE, 'boxes': BOX_DTYPE}
+
+class TrackStoreWriter:
+    def __init__(self, path, buffer_frames=256, resume=None):
+        self.path = path
+        self.buffer_frames = buffer_frames
+        os.makedirs(path, exist_ok=True)
+        self.pending = {name: [] for name in TABLES}
+        if resume is None:
+            self.files = {name: open(os.path.join(path, f'{name}.bin'), 'wb') for name in TABLES}
+            self.n_frames, self.n_objects, self.n_boxes = 0, 0, 0
+        else:
+            # Cut every table back to its row count at the checkpoint and append from there
+            self.n_frames, self.n_objects, self.n_boxes = resume['frames'], resume['objects'], resume['boxes']
+            rows = {'frames': self.n_frames, 'objects': self.n_objects, 'boxes': self.n_boxes}
+            self.files = {}
+            for name, dtype in TABLES.items():
+                f = open(os.path.join(path, f'{name}.bin'), 'r+b')
+                f.truncate(rows[name] * dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                self.files[name] = f
+
+    def write(self, frame_idx, objects, boxes, conf=None):
+        objs = np.zeros(len(objects), dtype=OBJECT_DTYPE)
+        objs['frame'] = frame_idx
+        if len(objects):
+            objs['track_id'] = np.fromiter(objects.keys(), dtype=int, count=len(objects))
+            centroids = np.asarray(list(objects.values())).reshape(-1, 2)
+            objs['cx'], objs['cy'] = centroids[:, 0], centroids[:, 1]
+        bxs = np.zeros(len(boxes), dtype=BOX_DTYPE)
+        bxs['frame'] = frame_idx
+        bxs['conf'] = np.nan if conf is None else conf
+        if len(boxes):
+            coords = np.asarray(boxes, dtype=float).reshape(-1, 4).astype(int)
+            for j, name in enumerate(('x1', 'y1', 'x2', 'y2')):
+                bxs[name] = coords[:, j]
+        index = np.array([(frame_idx, self.n_objects, len(objs), self.n_boxes, len(bxs))], dtype=FRAME_DTYPE)
+        self.pending['frames'].append(index)
+        self.pending['objects'].append(objs)
+        self.pending['boxes'].append(bxs)
+        self.n_objects += len(objs)
+        self.n_boxes += len(bxs)
+        self.n_frames += 1
+        if len(self.pending['frames']) >= self.buffer_frames:
+            self.flush()
+
+    def flush(self):
+        for name, chunks in self.pending.items():
+            if chunks:
+                self.files[name].write(np.concatenate(chunks).tobytes())
+                self.files[name].flush()
+            self.pending[name] = []
+
+    def state(self):
+        self.flush()
+        return {'frames': self.n_frames, 'objects': self.n_objects, 'boxes': self.n_boxes}
+
+    def close(self):
+        self.flush()
+        for f in self.files.values():
+            f.close()
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump({'version': 1, 'frames': self.n_frames, 'objects': self.n_objects, 'boxes': self.n_boxes}, f)
+        print(f'[INFO] Tracking results saved to {self.path}')
+
+class TrackStore:
+    def __init__(self, path):
+        self.path = path
+        self.tables = {name: self._map(name, dtype) for name, dtype in TABLES.items()}
+
+    def _map(self, name, dtype):
+        file_path = os.path.join(self.path, f'{name}.bin')
+        # Row counts come from the file size, so a store cut short by a crash is still readable
+        count = os.path.getsize(file_path) // dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode='r', shape=(count,))
+
+    @property
+    def frames(self):
+        return self.tables['frames']
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame_range(self, start=None, stop=None):
+        frames = self.frames['frame']
+        lo = 0 if start is None else int(np.searchsorted(frames, start, side='left'))
+        hi = len(frames) if stop is None else int(np.searchsorted(frames, stop, side='left'))
+        if hi <= lo:
+            return np.zeros(0, dtype=OBJECT_DTYPE), np.zeros(0, dtype=BOX_DTYPE)
+        first, last = self.frames[lo], self.frames[hi - 1]
+        objects = self.tables['objects'][first['obj_start']:last['obj_start'] + last['obj_count']]
+        boxes = self.tables['boxes'][first['box_start']:last['box_start'] + last['box_count']]
+        return np.asarray(objects), np.asarray(boxes)
+
+    def track(self, track_id):
+        objects = self.tables['objects']
+        return np.asarray(objects[objects['track_id'] == track_id])
+
+    def record(self, i):
+        row = self.frames[i]
+        objects = self.tables['objects'][row['obj_start']:row['obj_start'] + row['obj_count']]
+        boxes = self.tables['boxes'][row['box_start']:row['box_start'] + row['box_count']]
+        return {
+            'frame': int(row['frame']),
+            'objects': {str(o['track_id']): [int(o['cx']), int(o['cy'])] for o in objects},
+            'boxes': [[int(b['x1']), int(b['y1']), int(b['x2']), int(b['y2'])] for b in boxes],
+        }
+
+    def __getitem__(self, i):
+        return self.record(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.record(i)
+
+def json_to_store(json_path, store_path):
+    writer = TrackStoreWriter(store_path)
+    for frame_data in iter_tracking_results(json_path):
+        objects = {int(k): v for k, v in frame_data['objects'].items()}
+        writer.write(frame_data['frame'], objects, frame_data['boxes'])
+    writer.close()
+
+def store_to_json(store_path, json_path):
+    save_tracking_results(list(TrackStore(store_path)), json_path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert tracking results (JSON or JSON Lines) to and from the columnar track store')
+    parser.add_argument('command', choices=['to-store', 'to-json'])
+    parser.add_argument('src')
+    parser.add_argument('dst')
+    args = parser.parse_args()
+    if args.command == 'to-store':
+        json_to_store(args.src, args.dst)
+    else:
+        store_to_json(args.src, args.dst)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import numpy as np
+
+def warp_points(points, H):
+    # Applies a 3x3 homography to an (n, 2) array of pixel coordinates
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) == 0:
+        return points
+    mapped = np.hstack([points, np.ones((len(points), 1))]) @ H.T
+    return mapped[:, :2] / mapped[:, 2:]
+
+class PlayerTracker:
+    def __init__(self, max_disappeared=10):
+        self.next_object_id = 0
+        self.objects = dict()
+        self.disappeared = dict()
+        self.max_disappeared = max_disappeared
+
+    def register(self, centroid):
+        self.objects[self.next_object_id] = centroid
+        self.disappeared[self.next_object_id] = 0
+        self.next_object_id += 1
+
+    def deregister(self, object_id):
+        del self.objects[object_id]
+        del self.disappeared[object_id]
+
+    def warp(self, H):
+        # Camera motion compensation: move every track into the current frame's pixel coordinates
+        if self.objects:
+            warped = warp_points(list(self.objects.values()), H).round().astype(int)
+            self.objects = dict(zip(self.objects.keys(), warped))
+
+    def update(self, detections):
+        if len(detections) == 0:
+            for object_id in list(self.disappeared.keys()):
+                self.disappeared[object_id] += 1
+                if self.disappeared[object_id] > self.max_disappeared:
+                    self.deregister(object_id)
+            return self.objects
+        input_centroids = np.zeros((len(detections), 2), dtype="int")
+        for (i, bbox) in enumerate(detections):
+            x1, y1, x2, y2 = bbox
+            cX = int((x1 + x2) / 2.0)
+            cY = int((y1 + y2) / 2.0)
+            input_centroids[i] = (cX, cY)
+        if len(self.objects) == 0:
+            for i in range(len(input_centroids)):
+                self.register(input_centroids[i])
+        else:
+            object_ids = list(self.objects.keys())
+            object_centroids = list(self.objects.values())
+            from scipy.spatial import distance as dist
+            D = dist.cdist(np.array(object_centroids), input_centroids)
+            rows = D.min(axis=1).argsort()
+            cols = D.argmin(axis=1)[rows]
+            used_rows, used_cols = set(), set()
+            for (row, col) in zip(rows, cols):
+                if row in used_rows or col in used_cols:
+                    continue
+                object_id = object_ids[row]
+                self.objects[object_id] = input_centroids[col]
+                self.disappeared[object_id] = 0
+                used_rows.add(row)
+                used_cols.add(col)
+            unused_cols = set(range(0, D.shape[1])).difference(used_cols)
+            for col in unused_cols:
+                self.register(input_centroids[col])
+            unused_rows = set(range(0, D.shape[0])).difference(used_rows)
+            for row in unused_rows:
+                object_id = object_ids[row]
+                self.disappeared[object_id] += 1
+                if self.disappeared[object_id] > self.max_disappeared:
+                    self.deregister(object_id)
+        return self.objects
+
+def match_centroids(tracked, inputs, max_distance=None):
+    if len(tracked) == 0 or len(inputs) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    # scipy is only imported once there is something to match
+    from scipy.optimize import linear_sum_assignment
+    from scipy.spatial import distance as dist
+    D = dist.cdist(tracked, inputs)
+    if max_distance is not None:
+        D = np.where(D > max_distance, 1e9, D)
+    rows, cols = linear_sum_assignment(D)
+    if max_distance is not None:
+        valid = D[rows, cols] <= max_distance
+        rows, cols = rows[valid], cols[valid]
+    return rows, cols
+
+def assign_boxes(objects, boxes):
+    # Pairs tracks ({id: centroid}) with this frame's boxes, which come in detector order, not track
+    # order. A pair only counts when the track centroid lies inside the box, so tracks coasting
+    # without a detection this frame get no box. Returns the paired IDs and their box indices.
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    ids = list(objects)
+    if not ids or not len(boxes):
+        return [], np.empty(0, dtype=int)
+    centroids = np.array([objects[oid] for oid in ids], dtype=float).reshape(-1, 2)
+    rows, cols = match_centroids(centroids, (boxes[:, :2] + boxes[:, 2:]) / 2.0)
+    inside = np.all((boxes[cols, :2] <= centroids[rows]) & (centroids[rows] <= boxes[cols, 2:]), axis=1)
+    return [ids[r] for r in rows[inside]], cols[inside]
+
+class HungarianPlayerTracker:
+    # Same update() contract as PlayerTracker, with track state held in parallel NumPy arrays
+    # and detections assigned optimally (optionally gated by max_distance) instead of greedily.
+    def __init__(self, max_disappeared=10, max_distance=None):
+        self.next_object_id = 0
+        self.ids = np.empty(0, dtype=int)
+        self.centroids = np.empty((0, 2), dtype=int)
+        self.counters = np.empty(0, dtype=int)
+        self.max_disappeared = max_disappeared
+        self.max_distance = max_distance
+
+    @property
+    def objects(self):
+        # Copies: update() assigns into self.centroids, which would rewrite centroids already handed out
+        return dict(zip(self.ids.tolist(), self.centroids.copy()))
+
+    @property
+    def disappeared(self):
+        return dict(zip(self.ids.tolist(), self.counters.tolist()))
+
+    def register(self, centroids):
+        centroids = np.asarray(centroids, dtype=int).reshape(-1, 2)
+        new_ids = np.arange(self.next_object_id, self.next_object_id + len(centroids))
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.centroids = np.concatenate([self.centroids, centroids])
+        self.counters = np.concatenate([self.counters, np.zeros(len(centroids), dtype=int)])
+        self.next_object_id += len(centroids)
+        return new_ids
+
+    def deregister(self, object_id):
+        self._keep(self.ids != object_id)
+
+    def _keep(self, mask):
+        self.ids = self.ids[mask]
+        self.centroids = self.centroids[mask]
+        self.counters = self.counters[mask]
+
+    def warp(self, H):
+        self.centroids = warp_points(self.centroids, H).round().astype(int).reshape(-1, 2)
+
+    def update(self, detections):
+        boxes = np.asarray(detections, dtype=float).reshape(-1, 4)
+        input_centroids = ((boxes[:, :2] + boxes[:, 2:]) / 2.0).astype(int)
+        rows, cols = match_centroids(self.centroids, input_centroids, self.max_distance)
+        self.centroids[rows] = input_centroids[cols]
+        unmatched_rows = np.ones(len(self.ids), dtype=bool)
+        unmatched_rows[rows] = False
+        self.counters[rows] = 0
+        self.counters[unmatched_rows] += 1
+        self._keep(self.counters <= self.max_disappeared)
+        unmatched_cols = np.ones(len(input_centroids), dtype=bool)
+        unmatched_cols[cols] = False
+        self.register(input_centroids[unmatched_cols])
+        return self.objects
+
+class KalmanPlayerTracker:
+    # Constant-velocity Kalman state [cx, cy, vx, vy] per track, so tracks can be propagated
+    # with predict() on frames where the detector is skipped.
+    F = np.array([[1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=float)
+
+    def __init__(self, max_disappeared=10, max_distance=None, process_noise=1.0, measurement_noise=10.0):
+        self.next_object_id = 0
+        self.ids = np.empty(0, dtype=int)
+        self.states = np.empty((0, 4))
+        self.covariances = np.empty((0, 4, 4))
+        self.sizes = np.empty((0, 2))
+        self.counters = np.empty(0, dtype=int)
+        self.max_disappeared = max_disappeared
+        self.max_distance = max_distance
+        self.Q = process_noise * np.array([[0.25, 0, 0.5, 0], [0, 0.25, 0, 0.5], [0.5, 0, 1, 0], [0, 0.5, 0, 1]])
+        self.R = measurement_noise * np.eye(2)
+        self.P0 = np.diag([measurement_noise, measurement_noise, 100.0, 100.0])
+
+    @property
+    def centroids(self):
+        return self.states[:, :2].astype(int)
+
+    @property
+    def objects(self):
+        return dict(zip(self.ids.tolist(), self.centroids))
+
+    @property
+    def disappeared(self):
+        return dict(zip(self.ids.tolist(), self.counters.tolist()))
+
+    def register(self, centroids, sizes=None):
+        centroids = np.asarray(centroids, dtype=float).reshape(-1, 2)
+        n = len(centroids)
+        new_ids = np.arange(self.next_object_id, self.next_object_id + n)
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.states = np.concatenate([self.states, np.hstack([centroids, np.zeros((n, 2))])])
+        self.covariances = np.concatenate([self.covariances, np.repeat(self.P0[None], n, axis=0)])
+        self.sizes = np.concatenate([self.sizes, np.zeros((n, 2)) if sizes is None else sizes])
+        self.counters = np.concatenate([self.counters, np.zeros(n, dtype=int)])
+        self.next_object_id += n
+        return new_ids
+
+    def deregister(self, object_id):
+        self._keep(self.ids != object_id)
+
+    def _keep(self, mask):
+        self.ids = self.ids[mask]
+        self.states = self.states[mask]
+        self.covariances = self.covariances[mask]
+        self.sizes = self.sizes[mask]
+        self.counters = self.counters[mask]
+
+    def warp(self, H):
+        # Positions go through H; velocities, covariances and box sizes through its local linear part
+        if len(self.ids) == 0:
+            return
+        A = H[:2, :2] / H[2, 2]
+        T = np.zeros((4, 4))
+        T[:2, :2] = T[2:, 2:] = A
+        self.states[:, 2:] = self.states[:, 2:] @ A.T
+        self.states[:, :2] = warp_points(self.states[:, :2], H)
+        self.covariances = T @ self.covariances @ T.T
+        self.sizes = self.sizes * np.sqrt(abs(np.linalg.det(A)))
+
+    def predict(self):
+        self.states = self.states @ self.F.T
+        self.covariances = self.F @ self.covariances @ self.F.T + self.Q
+        return self.objects
+
+    def correct(self, rows, measurements):
+        P = self.covariances[rows]
+        K = P[:, :, :2] @ np.linalg.inv(P[:, :2, :2] + self.R)
+        innovation = measurements - self.states[rows, :2]
+        self.states[rows] += (K @ innovation[:, :, None])[:, :, 0]
+        self.covariances[rows] = P - K @ P[:, :2, :]
+
+    def uncertainty(self):
+        if len(self.ids) == 0:
+            return 0.0
+        position_var = self.covariances[:, 0, 0] + self.covariances[:, 1, 1]
+        return float(np.sqrt(position_var.max()))
+
+    def boxes(self):
+        half = self.sizes / 2.0
+        return np.hstack([self.states[:, :2] - half, self.states[:, :2] + half])
+
+    def update(self, detections):
+        boxes = np.asarray(detections, dtype=float).reshape(-1, 4)
+        measurements = (boxes[:, :2] + boxes[:, 2:]) / 2.0
+        sizes = boxes[:, 2:] - boxes[:, :2]
+        self.predict()
+        rows, cols = match_centroids(self.states[:, :2], measurements, self.max_distance)
+        self.correct(rows, measurements[cols])
+        self.sizes[rows] = sizes[cols]
+        unmatched_rows = np.ones(len(self.ids), dtype=bool)
+        unmatched_rows[rows] = False
+        self.counters[rows] = 0
+        self.counters[unmatched_rows] += 1
+        self._keep(self.counters <= self.max_disappeared)
+        unmatched_cols = np.ones(len(measurements), dtype=bool)
+        unmatched_cols[cols] = False
+        self.register(measurements[unmatched_cols], sizes[unmatched_cols])
+        return self.objects
+
+TRACKERS = {
+    'centroid': PlayerTracker,
+    'hungarian': HungarianPlayerTracker,
+    'kalman': KalmanPlayerTracker,
+}
+
+def create_tracker(kind='centroid', max_disappeared=15, **kwargs):
+    if kind not in TRACKERS:
+        raise ValueError(f'Unknown tracker {kind!r}; choose from {sorted(TRACKERS)}')
+    if kind == 'centroid':
+        return PlayerTracker(max_disappeared=max_disappeared)
+    # Options left unset on the CLI fall back to the backend's own defaults
+    kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    return TRACKERS[kind](max_disappeared=max_disappeared, **kwargs)
@@ -0,0 +1,118 @@
+import numpy as np
+
+# Plot-ready trajectories for long matches: each track is simplified to a tolerance expressed in
+# output pixels, so the number of drawn vertices depends on the plot size, not the match length.
+
+def rdp(points, tolerance, fixed=()):
+    # Ramer-Douglas-Peucker: indices of the vertices kept so no dropped point is farther than `tolerance` from the polyline.
+    # `fixed` vertices are always kept, so several polylines can be simplified in one call by fixing their end points.
+    # All pending segments are split in the same pass, so the Python loop runs once per recursion level, not per vertex
+    n = len(points)
+    if n < 3:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    keep[np.asarray(fixed, dtype=np.int64)] = True
+    pending = np.flatnonzero(~keep)
+    while len(pending):
+        kept = np.flatnonzero(keep)
+        seg = np.searchsorted(kept, pending) - 1
+        lo, hi = kept[seg], kept[seg + 1]
+        span = points[hi] - points[lo]
+        rel = points[pending] - points[lo]
+        length = np.hypot(span[:, 0], span[:, 1])
+        dists = np.where(length > 0, np.abs(span[:, 0] * rel[:, 1] - span[:, 1] * rel[:, 0]) / np.maximum(length, 1e-12), np.hypot(rel[:, 0], rel[:, 1]))
+        starts = np.flatnonzero(np.concatenate([[True], seg[1:] != seg[:-1]]))
+        seg_max = np.repeat(np.maximum.reduceat(dists, starts), np.diff(np.append(starts, len(seg))))
+        split = seg_max > tolerance
+        # First farthest point of each segment that is split, as argmax would pick; segments within tolerance are done
+        candidates = np.flatnonzero(split & (dists == seg_max))
+        _, first = np.unique(seg[candidates], return_index=True)
+        keep[pending[candidates[first]]] = True
+        pending = pending[split & ~keep[pending]]
+    return np.flatnonzero(keep)
+
+def grid_decimate(points, cell, fixed=()):
+    # Drops consecutive points that fall in the same `cell`-sized grid square (error at most cell * sqrt(2));
+    # `fixed` points are always kept
+    if len(points) < 3:
+        return np.arange(len(points))
+    cells = np.floor(points / cell).astype(np.int64)
+    keep = np.concatenate([[True], np.any(cells[1:] != cells[:-1], axis=1)])
+    keep[-1] = True
+    keep[np.asarray(fixed, dtype=np.int64)] = True
+    return np.flatnonzero(keep)
+
+def units_per_pixel(analytics, width_px=640, zoom=1.0):
+    span = np.ptp(analytics['traj_x']) if len(analytics['traj_x']) else 0.0
+    return max(float(span), 1.0) / (width_px * zoom)
+
+def viewport(analytics, zoom=1.0, center=(0.5, 0.5)):
+    # ((x0, x1), (y0, y1)) shown at `zoom`, centred at a fraction of the data extent
+    x, y = analytics['traj_x'], analytics['traj_y']
+    if not len(x):
+        return (0.0, 0.0), (0.0, 0.0)
+    limits = []
+    for values, c in ((x, center[0]), (y, center[1])):
+        lo, hi = float(values.min()), float(values.max())
+        mid, half = lo + c * (hi - lo), (hi - lo) / zoom / 2
+        limits.append((mid - half, mid + half))
+    return tuple(limits)
+
+def visible_runs(xy, starts, view):
+    # (start, end) of the runs of points inside `view`, each with its neighbours just outside so lines still
+    # reach the border; runs never cross a track start
+    (x0, x1), (y0, y1) = view
+    inside = (xy[:, 0] >= x0) & (xy[:, 0] <= x1) & (xy[:, 1] >= y0) & (xy[:, 1] <= y1)
+    first = np.zeros(len(xy), dtype=bool)
+    first[starts] = True
+    near = inside.copy()
+    near[1:] |= inside[:-1] & ~first[1:]
+    near[:-1] |= inside[1:] & ~first[1:]
+    begin = np.flatnonzero(near & (first | ~np.concatenate([[False], near[:-1]])))
+    last = np.flatnonzero(near & (np.append(first[1:], True) | ~np.append(near[1:], False)))
+    return begin, last + 1
+
+def simplify_tracks(analytics, tolerance_px=1.0, width_px=640, zoom=1.0, center=(0.5, 0.5)):
+    # Returns [(track id, [(M, 2) vertices, ...])] for the tracks visible at this zoom; `tolerance_px` is measured
+    # on a plot `width_px` wide. Zoomed views are clipped first, so off-screen points are never simplified
+    tolerance = tolerance_px * units_per_pixel(analytics, width_px, zoom)
+    offsets = np.asarray(analytics['traj_offsets'])
+    xy = np.stack([analytics['traj_x'], analytics['traj_y']], axis=1).astype(np.float64)
+    starts = offsets[:-1][offsets[1:] > offsets[:-1]]
+    if zoom > 1:
+        begin, end = visible_runs(xy, starts, viewport(analytics, zoom, center))
+        keep = end - begin > 1
+        begin, end = begin[keep], end[keep]
+    else:
+        begin, end = starts, offsets[1:][offsets[1:] > offsets[:-1]]
+    if not len(begin):
+        return []
+    owner = np.searchsorted(offsets, begin, side='right') - 1
+    lengths = end - begin
+    # Every track piece is simplified in one go, its end points fixed, so the passes run once for the whole match
+    index = np.repeat(begin - np.cumsum(np.append(0, lengths[:-1])), lengths) + np.arange(lengths.sum())
+    points = xy[index]
+    bounds = np.append(0, np.cumsum(lengths))
+    ends = np.concatenate([bounds[:-1], bounds[1:] - 1])
+    # A grid pass first removes jitter cheaply, so RDP only sees the points that move;
+    # the two errors (tolerance/3 * sqrt(2) + tolerance/2) stay within `tolerance`
+    coarse = grid_decimate(points, tolerance / 3, fixed=ends)
+    keep = coarse[rdp(points[coarse], tolerance / 2, fixed=np.searchsorted(coarse, ends))]
+    pieces = np.split(points[keep], np.searchsorted(keep, bounds[1:-1]))
+    tracks = []
+    for i, piece in zip(owner, pieces):
+        track_id = str(analytics['ids'][i])
+        if tracks and tracks[-1][0] == track_id:
+            tracks[-1][1].append(piece)
+        else:
+            tracks.append((track_id, [piece]))
+    return tracks
+
+def occupancy_heatmap(analytics, bins=(64, 36), extent=None):
+    # Frames spent per spatial cell by all tracks; returns (counts[y, x], x edges, y edges)
+    x, y = analytics['traj_x'], analytics['traj_y']
+    if extent is None and len(x):
+        extent = ((float(x.min()), float(x.max()) + 1), (float(y.min()), float(y.max()) + 1))
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=extent)
+    return counts.T, x_edges, y_edges
@@ -0,0 +1,244 @@
+import json
+import os
+import cv2
+import numpy as np
+
+def save_tracking_results(tracking_results, output_path):
+    try:
+        import os
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'w') as f:
+            json.dump(tracking_results, f)
+        print(f'[INFO] Tracking results saved to {output_path}')
+    except Exception as e:
+        print(f'[ERROR] Failed to save tracking results: {e}')
+
+TRACKING_EXTENSIONS = {'json': '.json', 'jsonl': '.jsonl', 'columnar': '.tracks'}
+
+def tracking_record(frame_idx, objects, boxes):
+    return {
+        'frame': frame_idx,
+        'objects': {str(object_id): list(map(int, centroid)) for object_id, centroid in objects.items()},
+        'boxes': [list(map(int, bbox)) for bbox in boxes]
+    }
+
+class JsonlTrackingWriter:
+    # One JSON record per line, flushed every buffer_frames frames: memory stays bounded and a
+    # crashed run keeps everything up to the last flush.
+    def __init__(self, path, buffer_frames=256, resume=None):
+        self.path = path
+        self.buffer_frames = buffer_frames
+        self.pending = []
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if resume is None:
+            self.file = open(path, 'w')
+        else:
+            # Drop anything written after the checkpoint and continue from there
+            self.file = open(path, 'r+')
+            self.file.truncate(resume['offset'])
+            self.file.seek(resume['offset'])
+
+    def write(self, frame_idx, objects, boxes, conf=None):
+        self.pending.append(json.dumps(tracking_record(frame_idx, objects, boxes)))
+        if len(self.pending) >= self.buffer_frames:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write('\n'.join(self.pending) + '\n')
+            self.file.flush()
+        self.pending = []
+
+    def state(self):
+        self.flush()
+        return {'offset': self.file.tell()}
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        print(f'[INFO] Tracking results saved to {self.path}')
+
+class JsonTrackingWriter(JsonlTrackingWriter):
+    # Streams the legacy JSON list format; the output is identical to save_tracking_results
+    def __init__(self, path, buffer_frames=256, resume=None):
+        super().__init__(path, buffer_frames, resume)
+        if resume is None:
+            self.file.write('[')
+            self.first = True
+        else:
+            self.first = resume['first']
+
+    def flush(self):
+        if self.pending:
+            self.file.write(('' if self.first else ', ') + ', '.join(self.pending))
+            self.file.flush()
+            self.first = False
+        self.pending = []
+
+    def state(self):
+        self.flush()
+        return {'offset': self.file.tell(), 'first': self.first}
+
+    def close(self):
+        self.flush()
+        self.file.write(']')
+        self.file.close()
+        print(f'[INFO] Tracking results saved to {self.path}')
+
+def open_tracking_writer(path, buffer_frames=256, resume=None):
+    if path.endswith(TRACKING_EXTENSIONS['columnar']):
+        from .track_store import TrackStoreWriter
+        return TrackStoreWriter(path, buffer_frames=buffer_frames, resume=resume)
+    if path.endswith(TRACKING_EXTENSIONS['jsonl']):
+        return JsonlTrackingWriter(path, buffer_frames=buffer_frames, resume=resume)
+    return JsonTrackingWriter(path, buffer_frames=buffer_frames, resume=resume)
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    # Incremental parse of a top-level JSON list of objects, one element at a time
+    decoder = json.JSONDecoder()
+    buf = ''
+    started = False
+    eof = False
+    while True:
+        buf = buf.lstrip()
+        if buf:
+            if not started:
+                if buf[0] != '[':
+                    raise ValueError('Tracking JSON must be a list of frame records')
+                buf = buf[1:]
+                started = True
+                continue
+            if buf[0] == ',':
+                buf = buf[1:]
+                continue
+            if buf[0] == ']':
+                return
+            try:
+                record, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield record
+                buf = buf[end:]
+                continue
+        elif eof:
+            return
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+
+def iter_tracking_results(path):
+    if os.path.isdir(path):
+        from .track_store import TrackStore
+        yield from TrackStore(path)
+        return
+    with open(path, 'r') as f:
+        if path.endswith(TRACKING_EXTENSIONS['jsonl']):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+class JsonlTrackingReader:
+    # Random access into a JSON Lines file through a byte-offset index (8 bytes per frame)
+    def __init__(self, path):
+        self.path = path
+        offsets = []
+        with open(path, 'rb') as f:
+            pos = 0
+            for line in f:
+                if line.strip():
+                    offsets.append(pos)
+                pos += len(line)
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        with open(self.path, 'rb') as f:
+            f.seek(self.offsets[i])
+            return json.loads(f.readline())
+
+    def __iter__(self):
+        return iter_tracking_results(self.path)
+
+def open_tracking_results(path):
+    # Indexable view of tracking results: memory-mapped for stores, offset-indexed for JSON Lines
+    if os.path.isdir(path):
+        from .track_store import TrackStore
+        return TrackStore(path)
+    if path.endswith(TRACKING_EXTENSIONS['jsonl']):
+        return JsonlTrackingReader(path)
+    return list(iter_tracking_results(path))
+
+def find_tracking_file(data_dir, stem):
+    for ext in ('.tracks', '.jsonl', '.json'):
+        candidate = os.path.join(data_dir, stem + ext)
+        if os.path.exists(candidate):
+            return candidate
+    return os.path.join(data_dir, stem + '.json')
+
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+def set_worker_thread_env(num_threads):
+    # OpenMP/BLAS read these only when they are first loaded, i.e. on the numpy import, which in a
+    # spawn worker happens before any pool initializer runs. Call this in the parent before the pool
+    # starts: workers inherit the environment and their BLAS picks the limit up at import.
+    if num_threads:
+        for var in THREAD_ENV_VARS:
+            os.environ[var] = str(num_threads)
+
+def set_thread_limits(num_threads):
+    # Runtime limits for the current process: OpenCV and torch always, the already-loaded BLAS
+    # only when threadpoolctl is installed (see set_worker_thread_env for spawned workers)
+    if not num_threads:
+        return
+    cv2.setNumThreads(num_threads)
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(num_threads)
+    except ImportError:
+        pass
+
+def read_batches(cap, batch_size, start=0, metrics=None):
+    batch = []
+    frame_idx = start
+    while True:
+        if metrics is None:
+            ret, frame = cap.read()
+        else:
+            with metrics.time('decode'):
+                ret, frame = cap.read()
+        if not ret:
+            break
+        batch.append((frame_idx, frame))
+        frame_idx += 1
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def draw_tracks(frame, objects, boxes, scale=1.0):
+    # Batched per frame: every centroid dot in one fillPoly call and every box in one polylines call;
+    # only the ID labels are drawn one at a time. `scale` maps full-resolution coordinates onto a resized frame.
+    if len(objects):
+        centroids = (np.asarray(list(objects.values()), dtype=float).reshape(-1, 2) * scale).astype(np.int32)
+        dot = cv2.ellipse2Poly((0, 0), (max(1, round(5 * scale)),) * 2, 0, 0, 360, 30)
+        cv2.fillPoly(frame, list(centroids[:, None, :] + dot), (0,255,0))
+        thickness = max(1, round(2 * scale))
+        for object_id, (cx, cy) in zip(objects.keys(), centroids.tolist()):
+            cv2.putText(frame, f'ID {object_id}', (cx-10, cy-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7 * scale, (0,255,0), thickness)
+    if len(boxes):
+        b = (np.asarray(boxes, dtype=float).reshape(-1, 4) * scale).astype(np.int32)
+        corners = np.stack([b[:, [0, 1]], b[:, [2, 1]], b[:, [2, 3]], b[:, [0, 3]]], axis=1)
+        cv2.polylines(frame, list(corners), True, (255,0,0), max(1, round(2 * scale)))
+    return frame
@@ -0,0 +1,58 @@
+import shutil
+import subprocess
+import cv2
+
+OUTPUT_MODES = ('data', 'proxy', 'full')
+ENCODERS = ('opencv', 'ffmpeg')
+
+class FfmpegVideoWriter:
+    # cv2.VideoWriter-compatible writer that pipes raw BGR frames to an ffmpeg subprocess,
+    # so a fast x264 preset can be used instead of OpenCV's mp4v encoder
+    def __init__(self, path, fps, size, codec='libx264', preset='veryfast', crf=23):
+        width, height = size
+        # yuv420p needs even dimensions: odd full-resolution sizes get one padding row/column
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', f'{fps}', '-i', '-',
+            '-an', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-c:v', codec, '-preset', preset, '-crf', str(crf), '-pix_fmt', 'yuv420p', path,
+        ]
+        self.path = path
+        self.size = size
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def isOpened(self):
+        return self.proc.poll() is None
+
+    def write(self, frame):
+        try:
+            self.proc.stdin.write(frame.tobytes())
+        except BrokenPipeError:
+            raise RuntimeError(f'ffmpeg exited with status {self.proc.wait()} while encoding {self.path}; see its error output above') from None
+
+    def release(self):
+        if self.proc.stdin and not self.proc.stdin.closed:
+            self.proc.stdin.close()
+            if self.proc.wait() != 0:
+                print(f'[ERROR] ffmpeg exited with status {self.proc.returncode}')
+
+def resolve_encoder(encoder):
+    if encoder == 'ffmpeg' and shutil.which('ffmpeg') is None:
+        print('[ERROR] ffmpeg not found, encoding with OpenCV instead')
+        return 'opencv'
+    return encoder
+
+def open_video_writer(path, fps, size, encoder='opencv', preset='veryfast', crf=23):
+    if encoder == 'ffmpeg':
+        return FfmpegVideoWriter(path, fps, size, preset=preset, crf=crf)
+    return cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+
+def output_geometry(mode, fps, size, proxy_scale=0.5, proxy_fps=10.0):
+    # (frame step, output fps, output size, overlay scale) for an output mode; 'data' writes no video.
+    # Proxy sizes are rounded to even dimensions, which yuv420p encoders require.
+    if mode == 'full':
+        return 1, fps, size, 1.0
+    if mode == 'proxy':
+        step = max(1, round(fps / proxy_fps)) if proxy_fps and fps else 1
+        width, height = (max(2, int(d * proxy_scale) // 2 * 2) for d in size)
+        return step, fps / step, (width, height), width / size[0]
+    return None, None, None, None
@@ -0,0 +1,37 @@
+import importlib
+import threading
+import numpy as np
+
+HEAVY_MODULES = ('torch', 'ultralytics', 'scipy.optimize', 'scipy.spatial')
+
+def preload_modules(names=HEAVY_MODULES, background=True):
+    # Imports heavy dependencies ahead of first use, e.g. while a CLI is still opening its inputs.
+    # Missing optional packages are skipped. Returns the loader thread when run in the background.
+    def load():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+    if not background:
+        load()
+        return None
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+def warmup_detector(detector, size=(640, 640), batch_size=1, runs=1):
+    # Throwaway inference so one-time costs (weight loading, kernel selection, graph optimization)
+    # are paid before the first real batch instead of showing up as a latency spike
+    frame = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    for _ in range(runs):
+        detector.detect_batch([frame] * batch_size)
+    return detector
+
+def preload(model_path=None, backend=None, threads=None, imgsz=None, size=(640, 640), batch_size=1, runs=1):
+    # Start-up hook for long-lived workers: import everything now and, given weights, return a warmed-up detector
+    preload_modules(background=False)
+    if model_path is None:
+        return None
+    from .detector import create_detector
+    return warmup_detector(create_detector(model_path, backend, threads, imgsz), size, batch_size, runs)
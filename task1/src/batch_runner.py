@@ -0,0 +1,217 @@
+import os
+import argparse
+import hashlib
+import json
+import multiprocessing
+import pickle
+import socket
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from soccer_core.utils import TRACKING_EXTENSIONS, set_thread_limits, set_worker_thread_env
+from soccer_core.warmup import preload
+from cross_camera_mapping import add_pipeline_arguments, camera_options, parse_camera, run_camera, write_mappings
+
+# Options that change what a camera job writes; anything else (threads, metrics, warm-up, resume) only
+# changes how fast it gets there and must not invalidate finished outputs
+OUTPUT_OPTIONS = ('model_path', 'backend', 'batch_size', 'feature_pass', 'tracking_format', 'tracker', 'max_distance', 'detect_every',
+                  'max_uncertainty', 'reid_similarity', 'reid_ttl', 'output_mode', 'encoder', 'preset', 'proxy_scale', 'proxy_fps',
+                  'imgsz', 'roi', 'roi_refresh', 'far_tiles', 'motion', 'max_motion')
+
+_detector = None
+
+def load_manifest(path):
+    # {"matches": [{"name": "...", "cameras": ["broadcast=videos/m1_broadcast.mp4", "tacticam=..."]}, ...]}
+    # Relative video paths are resolved against the manifest's directory
+    with open(path) as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    matches = []
+    for match in manifest['matches']:
+        cameras = [parse_camera(spec) for spec in match['cameras']]
+        matches.append((match['name'], [(name, os.path.join(base, video)) for name, video in cameras]))
+    names = [name for name, _ in matches]
+    if len(set(names)) != len(names):
+        raise ValueError('Match names in the manifest must be unique')
+    return matches
+
+class HashCache:
+    # sha256 of file contents, remembered per (path, size, mtime) so unchanged inputs are read only once
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def digest(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        entry = self.entries.get(path)
+        if entry is None or entry['stamp'] != stamp:
+            h = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+            entry = self.entries[path] = {'stamp': stamp, 'sha256': h.hexdigest()}
+        return entry['sha256']
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+def job_key(video_hash, model_hash, options):
+    spec = {'video': video_hash, 'model': model_hash, 'options': {k: options[k] for k in OUTPUT_OPTIONS}}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+def job_outputs(name, options):
+    data_dir = options['data_dir']
+    outputs = [os.path.join(data_dir, f'tracking_{name}' + TRACKING_EXTENSIONS[options['tracking_format']]), features_path(data_dir, name)]
+    if options['output_mode'] != 'data':
+        outputs.append(os.path.join(data_dir, f'output_{name}_tracked.mp4'))
+    return outputs
+
+def features_path(data_dir, name):
+    return os.path.join(data_dir, f'features_{name}.pkl')
+
+def stamp_path(data_dir, name):
+    return os.path.join(data_dir, f'job_{name}.json')
+
+def up_to_date(name, options, key):
+    path = stamp_path(options['data_dir'], name)
+    if not os.path.exists(path):
+        return False
+    with open(path) as f:
+        stamp = json.load(f)
+    return stamp.get('key') == key and all(os.path.exists(p) for p in job_outputs(name, options))
+
+def init_worker(options, threads):
+    # Runs once per worker process: the model is loaded and warmed up here and reused for every job
+    global _detector
+    set_thread_limits(threads)
+    _detector = preload(options['model_path'], options['backend'], threads, options['imgsz'], batch_size=options['batch_size'], runs=options['warmup'])
+
+def run_job(job):
+    match, name, video_path, options, key = job
+    started = time.time()
+    record = {'match': match, 'camera': name, 'video': video_path, 'host': socket.gethostname(), 'pid': os.getpid(), 'started': started}
+    try:
+        os.makedirs(options['data_dir'], exist_ok=True)
+        _, features = run_camera((name, video_path, options), detector=_detector)
+        with open(features_path(options['data_dir'], name), 'wb') as f:
+            pickle.dump(features, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Written last: a job that dies half-way leaves no stamp and is redone on the next run
+        with open(stamp_path(options['data_dir'], name), 'w') as f:
+            json.dump({'key': key, 'video': video_path, 'finished': time.time()}, f)
+        record.update(status='done', ids=len(features))
+    except Exception:
+        features = None
+        record.update(status='failed', error=traceback.format_exc())
+    record['seconds'] = round(time.time() - started, 3)
+    return record, features
+
+def plan_jobs(matches, args, threads, hashes, model_hash, log):
+    # Hashes every camera's video and splits the cameras into jobs to run and ones already up to date.
+    # A video that cannot be read fails only its own job (logged), never the whole batch.
+    jobs, pending, features, failed = [], {}, {}, 0
+    for match, cameras in matches:
+        options = camera_options(args, os.path.join(args.output_root, match), threads)
+        pending[match] = {name for name, _ in cameras}
+        features[match] = {}
+        for name, video_path in cameras:
+            try:
+                key = job_key(hashes.digest(video_path), model_hash, options)
+            except OSError as e:
+                failed += 1
+                pending[match].discard(name)
+                print(f'[ERROR] {match}/{name}: cannot read {video_path}: {e}')
+                log({'match': match, 'camera': name, 'video': video_path, 'status': 'failed', 'error': str(e), 'time': time.time()})
+                continue
+            if not args.force and up_to_date(name, options, key):
+                try:
+                    with open(features_path(options['data_dir'], name), 'rb') as f:
+                        features[match][name] = pickle.load(f)
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    # Unreadable cached features: redo the job rather than skip it
+                    jobs.append((match, name, video_path, options, key))
+                    continue
+                pending[match].discard(name)
+                log({'match': match, 'camera': name, 'video': video_path, 'status': 'skipped', 'time': time.time()})
+                continue
+            jobs.append((match, name, video_path, options, key))
+    return jobs, pending, features, failed
+
+def main():
+    parser = argparse.ArgumentParser(description='Process many matches from a manifest on a pool of long-lived workers')
+    parser.add_argument('manifest', help='JSON manifest: {"matches": [{"name": ..., "cameras": ["name=path", ...]}, ...]}')
+    parser.add_argument('--output-root', default='batch_output', help='Each match is written to <output-root>/<match name>/')
+    parser.add_argument('--status', default=None, help='Per-job status JSON Lines (default: <output-root>/status.jsonl)')
+    parser.add_argument('--force', action='store_true', help='Reprocess cameras even when their outputs are up to date')
+    add_pipeline_arguments(parser)
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 1) // 4), help='Worker processes, each with its own copy of the model')
+    parser.add_argument('--threads-per-worker', type=int, default=0, help='torch/OpenCV threads per worker (default: cores / workers)')
+    args = parser.parse_args()
+
+    matches = load_manifest(args.manifest)
+    os.makedirs(args.output_root, exist_ok=True)
+    status_path = args.status or os.path.join(args.output_root, 'status.jsonl')
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+    hashes = HashCache(os.path.join(args.output_root, 'hashes.json'))
+    model_hash = hashes.digest(args.model)
+    with open(status_path, 'a') as status:
+        def log(record):
+            status.write(json.dumps(record) + '\n')
+            status.flush()
+
+        print('[STEP] Hashing inputs...')
+        jobs, pending, features, failed = plan_jobs(matches, args, threads, hashes, model_hash, log)
+        hashes.save()
+        # Longest videos first, so a long match does not start last and leave the other workers idle
+        jobs.sort(key=lambda job: -os.path.getsize(job[2]))
+        print(f'[INFO] {len(jobs)} camera jobs to run, {sum(len(c) for _, c in matches) - len(jobs) - failed} up to date, {failed} failed')
+
+        def finish(match):
+            names = [name for name, _ in dict(matches)[match]]
+            if len(names) > 1 and all(name in features[match] for name in names):
+                print(f'[STEP] Mapping IDs across cameras for {match}...')
+                write_mappings(features[match], names, os.path.join(args.output_root, match), args.match_metric, args.max_cost)
+                log({'match': match, 'status': 'mapped', 'time': time.time()})
+
+        for match in features:
+            if not pending[match]:
+                finish(match)
+        done = 0
+        if jobs:
+            set_worker_thread_env(threads)
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs)), mp_context=ctx, initializer=init_worker, initargs=(jobs[0][3], threads)) as pool:
+                futures = {pool.submit(run_job, job): job for job in jobs}
+                for future in as_completed(futures):
+                    try:
+                        record, camera_features = future.result()
+                    except Exception:
+                        # The worker itself died (e.g. killed while decoding); run_job could not report it
+                        match, name, video_path = futures[future][:3]
+                        record, camera_features = {'match': match, 'camera': name, 'video': video_path, 'status': 'failed',
+                                                   'error': traceback.format_exc(), 'seconds': 0.0}, None
+                    log(record)
+                    match, name = record['match'], record['camera']
+                    pending[match].discard(name)
+                    if record['status'] == 'failed':
+                        failed += 1
+                        print(f"[ERROR] {match}/{name} failed after {record['seconds']:.1f}s:\n{record['error']}")
+                        continue
+                    done += 1
+                    print(f"[INFO] {match}/{name} done in {record['seconds']:.1f}s")
+                    features[match][name] = camera_features
+                    if not pending[match]:
+                        finish(match)
+    print(f'[SUCCESS] Batch finished: {done} jobs run, {failed} failed; status in {status_path}')
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
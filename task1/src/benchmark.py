@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from synthetic import generate_clip, ReplayDetector
+from soccer_core.tracker import create_tracker
+from soccer_core.motion import MOTION_METHODS, GlobalMotionEstimator
+from player_mapper import FeatureAccumulator, map_players
+from soccer_core.utils import draw_tracks
+from soccer_core.warmup import preload_modules
+
+STAGES = ['decode', 'motion', 'detect', 'track', 'features', 'render', 'encode', 'map_players']
+
+def run_case(n_players, width, height, frames, tracker_kind='centroid', model_path=None, workdir=None, seed=0, pan=0, motion=None):
+    clip = os.path.join(workdir, f'synthetic_{n_players}p_{width}x{height}.mp4')
+    ground_truth = generate_clip(clip, n_players, width, height, frames, seed=seed, pan=pan)
+    if model_path:
+        from soccer_core.detector import create_detector
+        detector = create_detector(model_path)
+    else:
+        detector = ReplayDetector(ground_truth, jitter=1.0, seed=seed)
+    tracker = create_tracker(tracker_kind, max_disappeared=15)
+    estimator = GlobalMotionEstimator(motion) if motion else None
+    features = FeatureAccumulator()
+    timings = {stage: 0.0 for stage in STAGES}
+    cap = cv2.VideoCapture(clip)
+    out = cv2.VideoWriter(os.path.join(workdir, 'encoded.mp4'), cv2.VideoWriter_fourcc(*'mp4v'), 25, (width, height))
+    player_cls = detector.class_ids('player')
+    n = 0
+    boxes = None
+    while True:
+        t0 = time.perf_counter()
+        ret, frame = cap.read()
+        t1 = time.perf_counter()
+        if not ret:
+            break
+        if estimator is not None:
+            tracker.warp(estimator.estimate(frame, boxes))
+        tm = time.perf_counter()
+        boxes, conf, cls = detector.detect_batch([frame])[0]
+        boxes = boxes[np.isin(cls, player_cls)]
+        t2 = time.perf_counter()
+        objects = dict(tracker.update(boxes))
+        t3 = time.perf_counter()
+        features.add_frame(frame, objects, boxes)
+        t4 = time.perf_counter()
+        draw_tracks(frame, objects, boxes)
+        t5 = time.perf_counter()
+        out.write(frame)
+        t6 = time.perf_counter()
+        for stage, elapsed in zip(STAGES, (t1 - t0, tm - t1, t2 - tm, t3 - t2, t4 - t3, t5 - t4, t6 - t5)):
+            timings[stage] += elapsed
+        n += 1
+    cap.release()
+    out.release()
+    # Map the clip onto a perturbed copy of itself: same problem size as a second camera
+    features_a = features.means()
+    rng = np.random.default_rng(seed)
+    features_b = {f'b{oid}': hist + rng.normal(0, 0.01, hist.shape).astype(np.float32) for oid, hist in features_a.items()}
+    t0 = time.perf_counter()
+    map_players(features_a, features_b)
+    timings['map_players'] = time.perf_counter() - t0
+    per_frame = {stage: 1000 * timings[stage] / max(n, 1) for stage in STAGES if stage != 'map_players'}
+    total = sum(timings[stage] for stage in STAGES if stage != 'map_players')
+    return {
+        'players': n_players,
+        'resolution': f'{width}x{height}',
+        'frames': n,
+        'ids_created': int(tracker.next_object_id),
+        'ms_per_frame': per_frame,
+        'map_players_ms': 1000 * timings['map_players'],
+        'fps': n / total if total else 0.0,
+    }
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, 'r') as f:
+        baseline = {(r['players'], r['resolution']): r for r in json.load(f)}
+    regressions = []
+    for r in results:
+        base = baseline.get((r['players'], r['resolution']))
+        if base is None:
+            continue
+        for stage, ms in r['ms_per_frame'].items():
+            old = base['ms_per_frame'].get(stage)
+            if old and ms > old * (1 + tolerance) and ms - old > 0.05:
+                regressions.append(f"{r['players']}p {r['resolution']} {stage}: {old:.2f} -> {ms:.2f} ms/frame")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline per-stage throughput benchmark on synthetic soccer clips')
+    parser.add_argument('--players', type=int, nargs='+', default=[10, 22, 40])
+    parser.add_argument('--resolutions', nargs='+', default=['1280x720', '1920x1080'])
+    parser.add_argument('--frames', type=int, default=150)
+    parser.add_argument('--tracker', choices=['centroid', 'hungarian', 'kalman'], default='centroid')
+    parser.add_argument('--pan', type=int, default=0, help='Sweep the synthetic camera this many pixels across a wider pitch and back')
+    parser.add_argument('--motion', choices=MOTION_METHODS, default=None, help='Compensate the pan with global motion estimation before tracking')
+    parser.add_argument('--model', default=None, help='Benchmark a real detector instead of replaying ground truth')
+    parser.add_argument('--output', default=None, help='Write results as JSON')
+    parser.add_argument('--baseline', default=None, help='Previous --output JSON to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown per stage vs the baseline')
+    args = parser.parse_args()
+    # Tracking and feature pairing import scipy on first use; keep that one-off cost out of the stage timings
+    preload_modules(('scipy.optimize', 'scipy.spatial'), background=False)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for resolution in args.resolutions:
+            width, height = map(int, resolution.split('x'))
+            for n_players in args.players:
+                results.append(run_case(n_players, width, height, args.frames, args.tracker, args.model, workdir, pan=args.pan, motion=args.motion))
+    print('| players | resolution | ' + ' | '.join(s for s in STAGES if s != 'map_players') + ' | map_players (ms) | fps | IDs |')
+    print('|---' * (len(STAGES) + 4) + '|')
+    for r in results:
+        stages = ' | '.join(f"{r['ms_per_frame'][s]:.2f}" for s in STAGES if s != 'map_players')
+        print(f"| {r['players']} | {r['resolution']} | {stages} | {r['map_players_ms']:.2f} | {r['fps']:.1f} | {r['ids_created']} |")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'[INFO] Benchmark results saved to {args.output}')
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f'[REGRESSION] {line}')
+        if regressions:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
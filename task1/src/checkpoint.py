@@ -0,0 +1,99 @@
+import os
+import glob
+import pickle
+import shutil
+import subprocess
+import cv2
+
+def checkpoint_path(output_json_path):
+    return output_json_path.rstrip('/\\') + '.ckpt'
+
+def save_checkpoint(path, state):
+    # Write to a temp file and rename, so a crash mid-write never leaves a corrupt checkpoint
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def seek_capture(cap, video_path, frame_idx):
+    if frame_idx == 0:
+        return cap
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame_idx:
+        return cap
+    # Backend could not seek exactly: reopen and skip frames without decoding them
+    cap.release()
+    cap = cv2.VideoCapture(video_path)
+    for _ in range(frame_idx):
+        if not cap.grab():
+            break
+    return cap
+
+class SegmentedVideoWriter:
+    # An mp4 cannot be reopened for appending, so a checkpointed run writes one segment per
+    # checkpoint interval and joins them when the run completes.
+    def __init__(self, path, fourcc, fps, size, completed_segments=0, open_writer=None):
+        self.path = path
+        self.fourcc = fourcc
+        self.fps = fps
+        self.size = size
+        self.open_writer = open_writer
+        self.parts_dir = path + '.parts'
+        os.makedirs(self.parts_dir, exist_ok=True)
+        for stale in self.segment_paths()[completed_segments:]:
+            os.remove(stale)
+        self.completed = completed_segments
+        self.out = self._open()
+        self.frames_in_segment = 0
+
+    def segment_paths(self):
+        return sorted(glob.glob(os.path.join(self.parts_dir, 'segment_*.mp4')))
+
+    def _segment(self):
+        return os.path.join(self.parts_dir, f'segment_{self.completed:06d}.mp4')
+
+    def _open(self):
+        if self.open_writer is not None:
+            return self.open_writer(self._segment())
+        return cv2.VideoWriter(self._segment(), self.fourcc, self.fps, self.size)
+
+    def write(self, frame):
+        self.out.write(frame)
+        self.frames_in_segment += 1
+
+    def roll(self):
+        self.out.release()
+        self.completed += 1
+        self.out = self._open()
+        self.frames_in_segment = 0
+        return self.completed
+
+    def release(self):
+        self.out.release()
+        if self.frames_in_segment == 0 and os.path.exists(self._segment()):
+            os.remove(self._segment())
+        segments = self.segment_paths()
+        list_path = os.path.join(self.parts_dir, 'segments.txt')
+        with open(list_path, 'w') as f:
+            f.writelines(f"file '{os.path.abspath(p)}'\n" for p in segments)
+        try:
+            subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy', self.path], check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f'[ERROR] Failed to join video segments with ffmpeg ({e}); re-encoding them with OpenCV')
+            out = cv2.VideoWriter(self.path, self.fourcc, self.fps, self.size)
+            for segment in segments:
+                cap = cv2.VideoCapture(segment)
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    out.write(frame)
+                cap.release()
+            out.release()
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
@@ -1,72 +1,377 @@
 import os
+import argparse
+import multiprocessing
+import pickle
+import queue
+from concurrent.futures import ProcessPoolExecutor, wait
 import cv2
-from detector import PlayerDetector
-from tracker import PlayerTracker
-from feature_extractor import extract_color_histogram
-from player_mapper import load_tracking_json, extract_all_features, map_players
-from utils import save_tracking_results
+import numpy as np
+from soccer_core.detector import create_detector
+from soccer_core.tracker import create_tracker
+from soccer_core.reid_gallery import ReIDGallery, ReIDTracker
+from player_mapper import METRICS, EmaFeatures, FeatureAccumulator, IncrementalMapper, load_tracking_json, extract_all_features, match_players
+from soccer_core.utils import TRACKING_EXTENSIONS, open_tracking_writer, set_thread_limits, set_worker_thread_env, read_batches, draw_tracks
+from soccer_core.pipeline import run_sequential, run_pipelined
+from soccer_core.metrics import StageMetrics
+from soccer_core.warmup import warmup_detector
+from soccer_core.roi import RoiDetector
+from soccer_core.motion import MOTION_METHODS, GlobalMotionEstimator, motion_magnitude
+from soccer_core.video_io import ENCODERS, OUTPUT_MODES, open_video_writer, output_geometry, resolve_encoder
+from checkpoint import SegmentedVideoWriter, checkpoint_path, load_checkpoint, save_checkpoint, seek_capture
 import json
 from tqdm import tqdm
 
-def process_video(video_path, model_path, output_video_path, output_json_path, label_filter='player'):
-    detector = PlayerDetector(model_path)
-    tracker = PlayerTracker(max_disappeared=15)
+def process_video(video_path, model_path, output_video_path, output_json_path, label_filter='player', batch_size=1, pipelined=False, queue_size=4, features=None, tracker_kind='centroid', max_distance=None, detect_every=None, max_uncertainty=None, checkpoint_every=0, resume=False, backend=None, detector_threads=None, metrics_path=None, prometheus_path=None, publish_every=0, publish=None, reid_similarity=None, reid_ttl=None, output_mode='full', encoder='opencv', preset='veryfast', proxy_scale=0.5, proxy_fps=10.0, warmup=0, imgsz=None, roi=False, roi_refresh=250, far_tiles=0.0, motion=None, max_motion=None, detector=None):
+    if detector is None:
+        detector = create_detector(model_path, backend, detector_threads, imgsz)
+        if warmup:
+            warmup_detector(detector, batch_size=batch_size, runs=warmup)
+    if roi:
+        detector = RoiDetector(detector, refresh_every=roi_refresh, far_fraction=far_tiles)
+    tracker = create_tracker(tracker_kind, max_disappeared=15, max_distance=max_distance)
+    reid = reid_similarity is not None
+    if reid:
+        tracker = ReIDTracker(tracker, ReIDGallery(ttl=reid_ttl, min_similarity=reid_similarity))
+    player_cls = detector.class_ids(label_filter)
+    if detect_every is None:
+        # With an uncertainty threshold, only the first frame is scheduled and the tracker decides the rest
+        detect_every = 1 if max_uncertainty is None else 0
+    elif detect_every == 1 and max_uncertainty is not None:
+        raise ValueError('--max-uncertainty has no frames to skip with --detect-every 1')
+    skipping = detect_every != 1
+    if skipping and not hasattr(tracker, 'predict'):
+        raise ValueError('Detection skipping needs a tracker with a motion model (--tracker kalman)')
+    if max_motion is not None and motion is None:
+        raise ValueError('--max-motion needs camera motion estimation (--motion lk|orb)')
+    # Boxes of the previous frame are masked out of the motion fit, so players do not drag the estimate
+    estimator, last_boxes = (GlobalMotionEstimator(motion) if motion else None), None
+    stats = {'detected': 0, 'predicted': 0}
+    metrics = StageMetrics({'video': os.path.basename(video_path)})
+    ckpt_path = checkpoint_path(output_json_path)
+    checkpoint = load_checkpoint(ckpt_path) if resume else None
+    start = 0
+    if checkpoint is not None:
+        start = checkpoint['frame_idx']
+        snapshot = pickle.loads(checkpoint['snapshot'])
+        tracker, features, stats = snapshot['tracker'], snapshot['features'], snapshot['stats']
+        estimator, last_boxes = snapshot.get('motion', (estimator, last_boxes))
+        if roi and snapshot.get('roi') is not None:
+            detector.load_state(snapshot['roi'])
+        print(f'[INFO] Resuming {os.path.basename(video_path)} from checkpoint at frame {start}')
+    elif resume:
+        print(f'[INFO] No checkpoint found for {os.path.basename(video_path)}, starting from frame 0')
+    if checkpoint_every:
+        # Keep checkpoints on batch boundaries so a resumed run sees the same batches
+        checkpoint_every = max(batch_size, checkpoint_every // batch_size * batch_size)
     cap = cv2.VideoCapture(video_path)
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     fps = cap.get(cv2.CAP_PROP_FPS)
-    out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
-    tracking_results = []
-    frame_idx = 0
-    pbar = tqdm(total=int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), desc=f"Processing {os.path.basename(video_path)}")
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        detections = detector.detect(frame)
-        player_boxes = [d['bbox'] for d in detections if d['label'].lower() == label_filter]
-        objects = tracker.update(player_boxes)
-        for object_id, centroid in objects.items():
-            cv2.circle(frame, tuple(centroid), 5, (0,255,0), -1)
-            cv2.putText(frame, f'ID {object_id}', (centroid[0]-10, centroid[1]-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
-        for bbox in player_boxes:
-            x1, y1, x2, y2 = map(int, bbox)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (255,0,0), 2)
-        out.write(frame)
-        tracking_results.append({
-            'frame': frame_idx,
-            'objects': {str(object_id): list(map(int, centroid)) for object_id, centroid in objects.items()},
-            'boxes': [list(map(int, bbox)) for bbox in player_boxes]
-        })
-        frame_idx += 1
-        pbar.update(1)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap = seek_capture(cap, video_path, start)
+    step, out_fps, out_size, overlay_scale = output_geometry(output_mode, fps, (width, height), proxy_scale, proxy_fps)
+    if step is not None:
+        encoder = resolve_encoder(encoder)
+    if step is None:
+        out = None
+    elif checkpoint_every or checkpoint is not None:
+        out = SegmentedVideoWriter(output_video_path, fourcc, out_fps, out_size, completed_segments=checkpoint['segments'] if checkpoint else 0,
+                                   open_writer=lambda path: open_video_writer(path, out_fps, out_size, encoder, preset))
+    else:
+        out = open_video_writer(output_video_path, out_fps, out_size, encoder, preset)
+    writer = open_tracking_writer(output_json_path, resume=checkpoint['writer'] if checkpoint else None)
+    pbar = tqdm(total=total_frames, initial=start, desc=f"Processing {os.path.basename(video_path)}")
+
+    def track(batch):
+        nonlocal last_boxes
+        scheduled = [i for i, (frame_idx, _) in enumerate(batch) if (frame_idx % detect_every == 0 if detect_every else frame_idx == 0)]
+        detections = {}
+        if scheduled:
+            with metrics.time('detect'):
+                detections = dict(zip(scheduled, detector.detect_batch([batch[i][1] for i in scheduled])))
+        results = []
+        for i, (frame_idx, frame) in enumerate(batch):
+            if estimator is not None:
+                # Move the tracks with the camera before they are associated or predicted
+                with metrics.time('motion'):
+                    H = estimator.estimate(frame, last_boxes)
+                    tracker.warp(H)
+                if i not in detections and max_motion is not None and (not estimator.reliable or motion_magnitude(H, (width, height)) > max_motion):
+                    with metrics.time('detect'):
+                        detections[i] = detector.detect_batch([frame])[0]
+            # An empty tracker has nothing to predict (and no uncertainty), so look for players again
+            if i not in detections and max_uncertainty is not None and (tracker.uncertainty() > max_uncertainty or not tracker.objects):
+                with metrics.time('detect'):
+                    detections[i] = detector.detect_batch([frame])[0]
+            if i in detections:
+                boxes, conf, cls = detections[i]
+                is_player = np.isin(cls, player_cls)
+                player_boxes, player_conf = boxes[is_player], conf[is_player]
+                with metrics.time('track'):
+                    objects = dict(tracker.update(player_boxes, frame) if reid else tracker.update(player_boxes))
+                if features is not None:
+                    # Histograms are taken here, on the clean decoded frame, before overlays are drawn
+                    with metrics.time('features'):
+                        features.add_frame(frame, objects, player_boxes)
+                stats['detected'] += 1
+            else:
+                with metrics.time('predict'):
+                    objects = dict(tracker.predict())
+                    player_boxes, player_conf = tracker.boxes(), None
+                stats['predicted'] += 1
+            last_boxes = player_boxes
+            if publish is not None and (frame_idx + 1) % publish_every == 0:
+                publish(frame_idx + 1, features)
+            snapshot = None
+            if checkpoint_every and (frame_idx + 1) % checkpoint_every == 0:
+                # Taken here, in step with the tracker; persisted once the render stage reaches this frame
+                snapshot = pickle.dumps({'tracker': tracker, 'features': features, 'stats': dict(stats), 'motion': (estimator, last_boxes),
+                                     'roi': detector.state() if roi else None})
+            results.append((frame_idx, frame, objects, player_boxes, player_conf, snapshot))
+        return results
+
+    def render(results):
+        for frame_idx, frame, objects, player_boxes, player_conf, snapshot in results:
+            if out is not None and frame_idx % step == 0:
+                with metrics.time('overlay'):
+                    canvas = frame if overlay_scale == 1.0 else cv2.resize(frame, out_size, interpolation=cv2.INTER_AREA)
+                    draw_tracks(canvas, objects, player_boxes, overlay_scale)
+                with metrics.time('encode'):
+                    out.write(canvas)
+            with metrics.time('write'):
+                writer.write(frame_idx, objects, player_boxes, player_conf)
+            if snapshot is not None:
+                with metrics.time('checkpoint'):
+                    save_checkpoint(ckpt_path, {'frame_idx': frame_idx + 1, 'snapshot': snapshot, 'writer': writer.state(), 'segments': out.roll() if out is not None else 0})
+            metrics.frame()
+            pbar.update(1)
+
+    if pipelined:
+        run_pipelined(read_batches(cap, batch_size, start, metrics), track, render, queue_size, metrics)
+    else:
+        run_sequential(read_batches(cap, batch_size, start, metrics), track, render)
     pbar.close()
     cap.release()
-    out.release()
-    save_tracking_results(tracking_results, output_json_path)
-    print(f'[SUCCESS] Output video saved to {output_video_path}')
+    if out is not None:
+        out.release()
+    writer.close()
+    if os.path.exists(ckpt_path):
+        os.remove(ckpt_path)
+    metrics.finish()
+    if metrics_path:
+        metrics.write_json(metrics_path)
+    if prometheus_path:
+        metrics.write_prometheus(prometheus_path)
+    if skipping:
+        total = stats['detected'] + stats['predicted']
+        print(f"[INFO] Detector ran on {stats['detected']}/{total} frames (detect:predict = {stats['detected']}:{stats['predicted']})")
+    if roi:
+        print(f'[INFO] Pitch ROI: detector saw {100 * detector.pixel_ratio():.0f}% of the frame pixels')
+    if out is not None:
+        print(f'[SUCCESS] Output video saved to {output_video_path}')
+    return features
+
+def parse_camera(spec):
+    name, sep, path = spec.partition('=')
+    if not sep:
+        path = spec
+        name = os.path.splitext(os.path.basename(spec))[0]
+    return name, path
+
+def run_camera(job, detector=None):
+    name, video_path, options = job
+    data_dir = options['data_dir']
+    out_video = os.path.join(data_dir, f'output_{name}_tracked.mp4')
+    out_json = os.path.join(data_dir, f'tracking_{name}' + TRACKING_EXTENSIONS[options['tracking_format']])
+    inline = options['feature_pass'] == 'inline'
+    metrics_path = os.path.join(data_dir, f'metrics_{name}.json') if options['metrics'] or options['prometheus'] else None
+    prometheus_path = os.path.join(data_dir, f'metrics_{name}.prom') if options['prometheus'] else None
+    live_queue = options.get('live_queue')
+    features = None
+    if live_queue is not None:
+        features = EmaFeatures(options['live_alpha'], options['live_window'])
+    elif inline:
+        features = FeatureAccumulator()
+
+    def publish(frame_count, features):
+        live_queue.put((name, frame_count, features.recent()))
+
+    print(f'[STEP] Detecting and tracking players in {name} video...')
+    features = process_video(video_path, options['model_path'], out_video, out_json, batch_size=options['batch_size'], pipelined=options['pipelined'], queue_size=options['queue_size'], tracker_kind=options['tracker'], max_distance=options['max_distance'], detect_every=options['detect_every'], max_uncertainty=options['max_uncertainty'], checkpoint_every=options['checkpoint_every'], resume=options['resume'], backend=options['backend'], detector_threads=options['detector_threads'], metrics_path=metrics_path, prometheus_path=prometheus_path, publish_every=options.get('live_every', 0), publish=publish if live_queue is not None else None, reid_similarity=options['reid_similarity'], reid_ttl=options['reid_ttl'], output_mode=options['output_mode'], encoder=options['encoder'], preset=options['preset'], proxy_scale=options['proxy_scale'], proxy_fps=options['proxy_fps'], warmup=options['warmup'], imgsz=options['imgsz'], roi=options['roi'], roi_refresh=options['roi_refresh'], far_tiles=options['far_tiles'], motion=options['motion'], max_motion=options['max_motion'], detector=detector, features=features)
+    if inline:
+        return name, features.means()
+    print(f'[STEP] Extracting appearance features for {name}...')
+    return name, extract_all_features(video_path, load_tracking_json(out_json))
+
+def stream_live_mapping(futures, live_queue, names, data_dir, metric, max_cost):
+    # Pairs each camera's windowed features with the reference camera's at the same frame count,
+    # and appends every change in the mapping to <camera>_to_<reference>_mapping_updates.jsonl
+    reference = names[0]
+    pending = {name: {} for name in names}
+    progress = dict.fromkeys(names, 0)
+    mappers = {name: IncrementalMapper(metric, max_cost) for name in names[1:]}
+    os.makedirs(data_dir, exist_ok=True)
+    logs = {name: open(os.path.join(data_dir, f'{name}_to_{reference}_mapping_updates.jsonl'), 'w') for name in names[1:]}
+    try:
+        while True:
+            try:
+                name, frame_count, features = live_queue.get(timeout=0.5)
+            except queue.Empty:
+                if all(f.done() for f in futures):
+                    break
+                continue
+            pending[name][frame_count] = features
+            progress[name] = frame_count
+            for other in names[1:]:
+                for f in sorted(pending[reference].keys() & pending[other].keys()):
+                    changes = mappers[other].update(pending[reference][f], pending[other].pop(f))
+                    if changes:
+                        logs[other].write(json.dumps({'frame': f, 'changes': changes}) + '\n')
+                        logs[other].flush()
+                # Snapshots the reference camera has already passed can no longer be paired
+                for f in [f for f in pending[other] if f < progress[reference]]:
+                    del pending[other][f]
+            # and reference snapshots are only needed until every other camera has passed them
+            horizon = min(progress[n] for n in names[1:])
+            for f in [f for f in pending[reference] if f <= horizon]:
+                del pending[reference][f]
+    finally:
+        for f in logs.values():
+            f.close()
+    for name, f in logs.items():
+        print(f'[INFO] Live mapping updates for {name} saved to {f.name} ({len(mappers[name].mapping)} IDs mapped)')
+
+def add_pipeline_arguments(parser):
+    # Per-camera detection/tracking/output options, shared with the batch runner
+    parser.add_argument('--model', default=os.path.join('models', 'best.pt'), help='Detector weights (.pt, or .onnx for ONNX Runtime)')
+    parser.add_argument('--backend', choices=['torch', 'onnx'], default=None, help='Detector backend (default: from the model file extension)')
+    parser.add_argument('--batch-size', type=int, default=8, help='Frames per detector call')
+    parser.add_argument('--pipelined', action='store_true', help='Run decode, detect+track and render/encode on separate threads')
+    parser.add_argument('--queue-size', type=int, default=4, help='Max batches buffered between pipeline stages')
+    parser.add_argument('--feature-pass', choices=['inline', 'rescan'], default='inline', help='Compute appearance features while tracking (inline) or by re-decoding the videos afterwards (rescan)')
+    parser.add_argument('--tracker', choices=['centroid', 'hungarian', 'kalman'], default='centroid', help='Tracker backend')
+    parser.add_argument('--max-distance', type=float, default=None, help='Gate for the hungarian/kalman trackers: max centroid jump in pixels')
+    parser.add_argument('--detect-every', type=int, default=None, help='Run the detector every K frames and predict tracks in between (kalman tracker; default: every frame, or with --max-uncertainty no fixed schedule)')
+    parser.add_argument('--max-uncertainty', type=float, default=None, help='Run the detector on unscheduled frames when predicted position std (pixels) exceeds this (kalman tracker; --detect-every K then caps the gap)')
+    parser.add_argument('--reid', type=float, default=None, metavar='SIMILARITY', help='Give a new track the ID of a dropped track whose appearance matches with at least this cosine similarity (e.g. 0.85)')
+    parser.add_argument('--reid-ttl', type=int, default=None, help='Forget dropped tracks after this many detector frames (default: keep until the gallery is full)')
+    parser.add_argument('--output-mode', choices=OUTPUT_MODES, default='full', help='full: annotated video at source resolution; proxy: downscaled, lower-fps preview; data: tracking data only, no overlay or encoding')
+    parser.add_argument('--encoder', choices=ENCODERS, default='opencv', help='Video encoder: OpenCV mp4v, or an ffmpeg pipe with x264 --preset')
+    parser.add_argument('--preset', default='veryfast', help='x264 preset for --encoder ffmpeg')
+    parser.add_argument('--proxy-scale', type=float, default=0.5, help='Resolution scale of the proxy video')
+    parser.add_argument('--proxy-fps', type=float, default=10.0, help='Approximate frame rate of the proxy video')
+    parser.add_argument('--tracking-format', choices=sorted(TRACKING_EXTENSIONS), default='json', help='Tracking output: JSON list, streamed JSON Lines, or a columnar .tracks store')
+    parser.add_argument('--checkpoint-every', type=int, default=0, help='Checkpoint tracker state and outputs every N frames (0 disables)')
+    parser.add_argument('--resume', action='store_true', help='Continue each camera from its last checkpoint')
+    parser.add_argument('--metrics', action='store_true', help='Write per-stage latency percentiles, queue depths and FPS to metrics_<camera>.json')
+    parser.add_argument('--prometheus', action='store_true', help='Also write the metrics in Prometheus text format (metrics_<camera>.prom)')
+    parser.add_argument('--warmup', type=int, default=0, help='Run this many dummy detector batches per camera before its video so start-up costs stay out of the timings')
+    parser.add_argument('--imgsz', type=int, default=None, help='Detector input size (longest side); smaller is faster, default is the model\'s export/training size')
+    parser.add_argument('--roi', action='store_true', help='Run the detector only on the pitch (green-dominant region), dropping detections off the pitch')
+    parser.add_argument('--roi-refresh', type=int, default=250, help='Re-estimate the pitch mask every N detector frames')
+    parser.add_argument('--far-tiles', type=float, default=0.0, metavar='FRACTION', help='With --roi, also tile the top FRACTION of the pitch (far side) at native resolution for small players, e.g. 0.4')
+    parser.add_argument('--motion', choices=MOTION_METHODS, default=None, help='Compensate camera pans/zooms: estimate global motion on a downscaled frame (lk: sparse optical flow, orb: keypoint matching) and move the tracks with it before association')
+    parser.add_argument('--max-motion', type=float, default=None, help='With --motion and detection skipping, also run the detector when the camera moved more than this many pixels (or the estimate is unreliable)')
+    parser.add_argument('--match-metric', choices=sorted(METRICS), default='l2', help='Appearance distance used to match IDs across cameras')
+    parser.add_argument('--max-cost', type=float, default=None, help='Leave ID pairs farther apart than this unmatched; also splits the matching into independent subproblems')
+    return parser
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Cross-camera player detection, tracking and ID mapping')
+    parser.add_argument('--cameras', nargs='+', default=[f"broadcast={os.path.join('data', 'broadcast.mp4')}", f"tacticam={os.path.join('data', 'tacticam.mp4')}"], help='Camera inputs as name=path; the first one is the reference the others are mapped to')
+    parser.add_argument('--data-dir', default='data', help='Directory for tracked videos, tracking JSON and mappings')
+    add_pipeline_arguments(parser)
+    parser.add_argument('--live-every', type=int, default=0, help='Re-solve the cross-camera mapping every N frames while the cameras are processed (0 disables)')
+    parser.add_argument('--live-alpha', type=float, default=0.1, help='EMA weight of each new observation in the live per-ID features')
+    parser.add_argument('--live-window', type=int, default=250, help='Drop IDs from live matching after this many detector frames without an observation')
+    parser.add_argument('--workers', type=int, default=1, help='Camera streams processed in parallel, one process each')
+    parser.add_argument('--threads-per-worker', type=int, default=0, help='torch/OpenCV threads per worker (default: cores / workers)')
+    return parser.parse_args()
+
+def camera_options(args, data_dir, detector_threads):
+    return {
+        'model_path': args.model,
+        'backend': args.backend,
+        'detector_threads': detector_threads,
+        'data_dir': data_dir,
+        'batch_size': args.batch_size,
+        'pipelined': args.pipelined,
+        'queue_size': args.queue_size,
+        'feature_pass': args.feature_pass,
+        'tracking_format': args.tracking_format,
+        'tracker': args.tracker,
+        'max_distance': args.max_distance,
+        'detect_every': args.detect_every,
+        'max_uncertainty': args.max_uncertainty,
+        'reid_similarity': args.reid,
+        'output_mode': args.output_mode,
+        'encoder': args.encoder,
+        'preset': args.preset,
+        'proxy_scale': args.proxy_scale,
+        'proxy_fps': args.proxy_fps,
+        'reid_ttl': args.reid_ttl,
+        'warmup': args.warmup,
+        'imgsz': args.imgsz,
+        'roi': args.roi,
+        'roi_refresh': args.roi_refresh,
+        'far_tiles': args.far_tiles,
+        'motion': args.motion,
+        'max_motion': args.max_motion,
+        'checkpoint_every': args.checkpoint_every,
+        'resume': args.resume,
+        'metrics': args.metrics,
+        'prometheus': args.prometheus,
+    }
+
+def write_mappings(features, names, data_dir, metric='l2', max_cost=None):
+    # Maps every camera after the first onto the first; returns {camera: mapping path}
+    reference = names[0]
+    paths = {}
+    for name in names[1:]:
+        matches = match_players(features[reference], features[name], metric, max_cost)
+        mapping = {m['id']: m['reference_id'] for m in matches}
+        mapping_path = os.path.join(data_dir, f'{name}_to_{reference}_id_mapping.json')
+        with open(mapping_path, 'w') as f:
+            json.dump(mapping, f)
+        matches_path = os.path.join(data_dir, f'{name}_to_{reference}_matches.json')
+        with open(matches_path, 'w') as f:
+            json.dump(matches, f)
+        print(f'[SUCCESS] Mapping saved to {mapping_path} ({len(mapping)}/{len(features[name])} IDs matched, confidences in {matches_path})')
+        paths[name] = mapping_path
+    return paths
 
 def main():
-    model_path = os.path.join('models', 'best.pt')
-    broadcast_path = os.path.join('data', 'broadcast.mp4')
-    tacticam_path = os.path.join('data', 'tacticam.mp4')
-    out_broadcast = os.path.join('data', 'output_broadcast_tracked.mp4')
-    out_tacticam = os.path.join('data', 'output_tacticam_tracked.mp4')
-    json_broadcast = os.path.join('data', 'tracking_broadcast.json')
-    json_tacticam = os.path.join('data', 'tracking_tacticam.json')
-    print('[STEP] Detecting and tracking players in broadcast video...')
-    process_video(broadcast_path, model_path, out_broadcast, json_broadcast)
-    print('[STEP] Detecting and tracking players in tacticam video...')
-    process_video(tacticam_path, model_path, out_tacticam, json_tacticam)
-    print('[STEP] Extracting appearance features and mapping IDs...')
-    features_broadcast = extract_all_features(broadcast_path, load_tracking_json(json_broadcast))
-    features_tacticam = extract_all_features(tacticam_path, load_tracking_json(json_tacticam))
-    mapping = map_players(features_broadcast, features_tacticam)
-    mapping_path = os.path.join('data', 'tacticam_to_broadcast_id_mapping.json')
-    with open(mapping_path, 'w') as f:
-        json.dump(mapping, f)
-    print(f'[SUCCESS] Mapping saved to {mapping_path}')
+    args = parse_args()
+    cameras = [parse_camera(spec) for spec in args.cameras]
+    live = args.live_every > 0 and len(cameras) > 1
+    if live and args.feature_pass != 'inline':
+        raise SystemExit('[ERROR] --live-every needs --feature-pass inline')
+    # Live mapping needs every camera in flight at once
+    workers = len(cameras) if live else max(1, min(args.workers, len(cameras)))
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    options = camera_options(args, args.data_dir, threads if workers > 1 else args.threads_per_worker)
+    options.update(live_every=args.live_every, live_alpha=args.live_alpha, live_window=args.live_window)
+    jobs = [(name, path, options) for name, path in cameras]
+    if workers > 1:
+        set_worker_thread_env(threads)
+    if live:
+        ctx = multiprocessing.get_context('spawn')
+        with ctx.Manager() as manager, ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=set_thread_limits, initargs=(threads,)) as pool:
+            options['live_queue'] = manager.Queue()
+            futures = [pool.submit(run_camera, job) for job in jobs]
+            stream_live_mapping(futures, options['live_queue'], [name for name, _ in cameras], args.data_dir, args.match_metric, args.max_cost)
+            wait(futures)
+            features = dict(f.result() for f in futures)
+    elif workers > 1:
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=set_thread_limits, initargs=(threads,)) as pool:
+            features = dict(pool.map(run_camera, jobs))
+    else:
+        set_thread_limits(args.threads_per_worker)
+        features = dict(map(run_camera, jobs))
+    print('[STEP] Mapping IDs across cameras...')
+    write_mappings(features, [name for name, _ in cameras], args.data_dir, args.match_metric, args.max_cost)
 
 if __name__ == "__main__":
     main()
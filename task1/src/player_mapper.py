@@ -1,39 +1,234 @@
 import numpy as np
-from scipy.optimize import linear_sum_assignment
-from feature_extractor import extract_color_histogram
+from soccer_core.feature_extractor import extract_color_histograms
 import cv2
-import json
+from soccer_core.tracker import assign_boxes
+from soccer_core.utils import iter_tracking_results
+
+class FeatureAccumulator:
+    # Running per-ID sum and count, so memory stays flat however long a track lives
+    def __init__(self):
+        self.sums = {}
+        self.counts = {}
+
+    def add(self, obj_id, hist):
+        if obj_id in self.sums:
+            self.sums[obj_id] += hist
+            self.counts[obj_id] += 1
+        else:
+            self.sums[obj_id] = np.asarray(hist, dtype=np.float64).copy()
+            self.counts[obj_id] = 1
+
+    def add_frame(self, frame, objects, boxes):
+        object_ids, cols = assign_boxes(objects, boxes)
+        hists = extract_color_histograms(frame, np.asarray(boxes, dtype=float).reshape(-1, 4)[cols])
+        for obj_id, hist in zip(object_ids, hists):
+            if hist.any():
+                self.add(str(obj_id), hist)
+
+    def means(self):
+        return {oid: (s / self.counts[oid]).astype(np.float32) for oid, s in self.sums.items()}
+
+class EmaFeatures(FeatureAccumulator):
+    # Adds a per-ID exponential moving average over recent observations; IDs unseen for `window`
+    # detector frames drop out of recent(), so live matching only sees tracks that are still active
+    def __init__(self, alpha=0.1, window=250):
+        super().__init__()
+        self.alpha = alpha
+        self.window = window
+        self.ema = {}
+        self.last_seen = {}
+        self.clock = 0
+
+    def add(self, obj_id, hist):
+        super().add(obj_id, hist)
+        if obj_id in self.ema:
+            self.ema[obj_id] += self.alpha * (hist - self.ema[obj_id])
+        else:
+            self.ema[obj_id] = np.asarray(hist, dtype=np.float64).copy()
+        self.last_seen[obj_id] = self.clock
+
+    def add_frame(self, frame, objects, boxes):
+        self.clock += 1
+        super().add_frame(frame, objects, boxes)
+
+    def recent(self):
+        for oid in [oid for oid, seen in self.last_seen.items() if self.clock - seen > self.window]:
+            del self.ema[oid], self.last_seen[oid]
+        return {oid: e.astype(np.float32) for oid, e in self.ema.items()}
 
 def load_tracking_json(json_path):
-    with open(json_path, 'r') as f:
-        return json.load(f)
+    # Lazy: frames are parsed one at a time as the caller iterates
+    return iter_tracking_results(json_path)
 
 def extract_all_features(video_path, tracking_json):
     cap = cv2.VideoCapture(video_path)
-    features_by_id = {}
-    frame_idx = 0
-    while True:
+    features = FeatureAccumulator()
+    for frame_data in tracking_json:
         ret, frame = cap.read()
-        if not ret or frame_idx >= len(tracking_json):
+        if not ret:
             break
-        frame_data = tracking_json[frame_idx]
-        for obj_id, bbox in zip(frame_data['objects'].keys(), frame_data['boxes']):
-            hist = extract_color_histogram(frame, bbox)
-            if obj_id not in features_by_id:
-                features_by_id[obj_id] = []
-            features_by_id[obj_id].append(hist)
-        frame_idx += 1
+        features.add_frame(frame, frame_data['objects'], frame_data['boxes'])
     cap.release()
-    avg_features = {oid: np.mean(hists, axis=0) for oid, hists in features_by_id.items() if len(hists) > 0}
-    return avg_features
-
-def map_players(features_a, features_b):
-    ids_a = list(features_a.keys())
-    ids_b = list(features_b.keys())
-    cost_matrix = np.zeros((len(ids_a), len(ids_b)))
-    for i, ida in enumerate(ids_a):
+    return features.means()
+
+def feature_matrix(features):
+    ids = list(features.keys())
+    if not ids:
+        return ids, np.zeros((0, 0))
+    return ids, np.stack([np.asarray(features[oid], dtype=np.float64).ravel() for oid in ids])
+
+def _unit_rows(x):
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+def _probability_rows(x):
+    x = np.maximum(x, 0)
+    return x / np.maximum(x.sum(axis=1, keepdims=True), 1e-12)
+
+def l2_distance(a, b):
+    sq = (a * a).sum(1)[:, None] + (b * b).sum(1)[None, :] - 2 * a @ b.T
+    return np.sqrt(np.maximum(sq, 0))
+
+def cosine_distance(a, b):
+    return np.clip(1 - _unit_rows(a) @ _unit_rows(b).T, 0, 2)
+
+def bhattacharyya_distance(a, b):
+    # Same as cv2.HISTCMP_BHATTACHARYYA, for all pairs at once
+    coeff = np.sqrt(_probability_rows(a)) @ np.sqrt(_probability_rows(b)).T
+    return np.sqrt(np.maximum(1 - coeff, 0))
+
+def chi_square_distance(a, b, chunk_elems=1 << 24):
+    # Symmetric chi-square on normalized histograms, in [0, 1]: 0.5 * sum((p - q)^2 / (p + q)) == 1 - 2 * sum(pq / (p + q)).
+    # Broadcast in row chunks to bound memory.
+    p, q = _probability_rows(a).astype(np.float32), _probability_rows(b).astype(np.float32)
+    out = np.empty((len(p), len(q)))
+    rows = max(1, chunk_elems // max(q.size, 1))
+    for start in range(0, len(p), rows):
+        pc = p[start:start + rows, None, :]
+        den = pc + q[None]
+        den += 1e-12
+        prod = pc * q[None]
+        prod /= den
+        out[start:start + rows] = 1 - 2 * prod.sum(2, dtype=np.float64)
+    return np.maximum(out, 0)
+
+METRICS = {
+    'l2': l2_distance,
+    'cosine': cosine_distance,
+    'bhattacharyya': bhattacharyya_distance,
+    'chi2': chi_square_distance,
+}
+
+def cost_matrix(features_a, features_b, metric='l2'):
+    ids_a, a = feature_matrix(features_a)
+    ids_b, b = feature_matrix(features_b)
+    if not ids_a or not ids_b:
+        return ids_a, ids_b, np.zeros((len(ids_a), len(ids_b)))
+    return ids_a, ids_b, METRICS[metric](a, b)
+
+def _solve(cost, feasible, split):
+    from scipy.optimize import linear_sum_assignment
+    if not split or feasible.all():
+        rows, cols = linear_sum_assignment(np.where(feasible, cost, 1e9))
+        return rows, cols
+    # Only pairs that pass the gate link IDs, so each connected component is an independent assignment
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    n, m = cost.shape
+    r, c = np.nonzero(feasible)
+    graph = csr_matrix((np.ones(len(r), bool), (r, n + c)), shape=(n + m, n + m))
+    _, labels = connected_components(graph, directed=False)
+    rows, cols = [], []
+    for label in np.unique(labels[:n]):
+        r = np.flatnonzero(labels[:n] == label)
+        c = np.flatnonzero(labels[n:] == label)
+        if len(c) == 0:
+            continue
+        sub_rows, sub_cols = linear_sum_assignment(np.where(feasible[np.ix_(r, c)], cost[np.ix_(r, c)], 1e9))
+        rows.append(r[sub_rows])
+        cols.append(c[sub_cols])
+    if not rows:
+        return np.zeros(0, int), np.zeros(0, int)
+    return np.concatenate(rows), np.concatenate(cols)
+
+def match_confidence(cost, rows, cols):
+    # Ratio test: how much better the chosen pair is than the runner-up for either ID (1 = unambiguous)
+    if cost.shape[0] < 2 and cost.shape[1] < 2:
+        return np.ones(len(rows))
+    chosen = cost[rows, cols]
+    masked = cost.copy()
+    masked[rows, cols] = np.inf
+    runner_up = np.minimum(masked[rows].min(1) if cost.shape[1] > 1 else np.inf,
+                           masked[:, cols].min(0) if cost.shape[0] > 1 else np.inf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        conf = np.where(np.isinf(runner_up), 1.0, np.where(runner_up > 0, 1 - chosen / runner_up, 0.0))
+    return np.clip(conf, 0, 1)
+
+def match_players(features_a, features_b, metric='l2', max_cost=None, split=True):
+    ids_a, ids_b, cost = cost_matrix(features_a, features_b, metric)
+    if cost.size == 0:
+        return []
+    feasible = cost <= max_cost if max_cost is not None else np.ones(cost.shape, bool)
+    rows, cols = _solve(cost, feasible, split)
+    keep = feasible[rows, cols]
+    rows, cols = rows[keep], cols[keep]
+    conf = match_confidence(cost, rows, cols)
+    return [{'id': ids_b[j], 'reference_id': ids_a[i], 'cost': float(cost[i, j]), 'confidence': float(c)}
+            for i, j, c in zip(rows, cols, conf)]
+
+def map_players(features_a, features_b, metric='l2', max_cost=None, split=True):
+    return {m['id']: m['reference_id'] for m in match_players(features_a, features_b, metric, max_cost, split)}
+
+class IncrementalMapper:
+    # Re-solves the mapping between the currently active IDs of two cameras. Pairs from the previous
+    # solution are kept while their cost stays within `margin` of the best alternative for either ID,
+    # so only new, lost or drifting IDs go through linear_sum_assignment on each update.
+    def __init__(self, metric='l2', max_cost=None, margin=0.1):
+        self.metric = metric
+        self.max_cost = max_cost
+        self.margin = margin
+        self.mapping = {}
+
+    def update(self, features_a, features_b):
+        ids_a, ids_b, cost = cost_matrix(features_a, features_b, self.metric)
+        changes = []
+        # IDs that left the window are unmapped too, so their reference IDs are free to be reassigned
+        active = set(ids_b)
+        for idb in [idb for idb in self.mapping if idb not in active]:
+            del self.mapping[idb]
+            changes.append({'id': idb, 'reference_id': None})
+        if cost.size == 0:
+            for idb in ids_b:
+                if self.mapping.pop(idb, None) is not None:
+                    changes.append({'id': idb, 'reference_id': None})
+            return changes
+        feasible = cost <= self.max_cost if self.max_cost is not None else np.ones(cost.shape, bool)
+        index_a = {ida: i for i, ida in enumerate(ids_a)}
+        kept_rows, kept_cols = [], []
+        row_best, col_best = cost.min(1), cost.min(0)
         for j, idb in enumerate(ids_b):
-            cost_matrix[i, j] = np.linalg.norm(features_a[ida] - features_b[idb])
-    row_ind, col_ind = linear_sum_assignment(cost_matrix)
-    mapping = {ids_b[j]: ids_a[i] for i, j in zip(row_ind, col_ind)}
-    return mapping
+            i = index_a.get(self.mapping.get(idb))
+            if i is not None and feasible[i, j] and cost[i, j] <= (1 + self.margin) * min(row_best[i], col_best[j]):
+                kept_rows.append(i)
+                kept_cols.append(j)
+        free_rows = np.setdiff1d(np.arange(len(ids_a)), kept_rows)
+        free_cols = np.setdiff1d(np.arange(len(ids_b)), kept_cols)
+        rows, cols = np.array(kept_rows, int), np.array(kept_cols, int)
+        if len(free_rows) and len(free_cols):
+            sub = np.ix_(free_rows, free_cols)
+            sub_rows, sub_cols = _solve(cost[sub], feasible[sub], True)
+            keep = feasible[sub][sub_rows, sub_cols]
+            rows = np.concatenate([rows, free_rows[sub_rows[keep]]])
+            cols = np.concatenate([cols, free_cols[sub_cols[keep]]])
+        conf = match_confidence(cost, rows, cols)
+        matched = set()
+        for i, j, c in zip(rows, cols, conf):
+            idb, ida = ids_b[j], ids_a[i]
+            matched.add(idb)
+            if self.mapping.get(idb) != ida:
+                self.mapping[idb] = ida
+                changes.append({'id': idb, 'reference_id': ida, 'cost': float(cost[i, j]), 'confidence': float(c)})
+        for idb in ids_b:
+            if idb not in matched and self.mapping.pop(idb, None) is not None:
+                changes.append({'id': idb, 'reference_id': None})
+        return changes
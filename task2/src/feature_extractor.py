@@ -1,10 +0,0 @@
-import cv2
-import numpy as np
-
-def extract_color_histogram(frame, bbox, bins=(8, 8, 8)):
-    x1, y1, x2, y2 = map(int, bbox)
-    roi = frame[y1:y2, x1:x2]
-    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-    hist = cv2.calcHist([hsv], [0, 1, 2], None, bins, [0, 180, 0, 256, 0, 256])
-    cv2.normalize(hist, hist)
-    return hist.flatten()
@@ -1,9 +1,16 @@
 import cv2
 import os
-from detector import PlayerDetector
-from tracker import PlayerTracker
-from feature_extractor import extract_color_histogram
-from utils import save_tracking_results
+import argparse
+from soccer_core.detector import create_detector
+from soccer_core.warmup import warmup_detector
+from soccer_core.roi import RoiDetector
+from soccer_core.motion import MOTION_METHODS, GlobalMotionEstimator
+from soccer_core.tracker import create_tracker
+from soccer_core.reid_gallery import ReIDGallery, ReIDTracker
+from soccer_core.utils import TRACKING_EXTENSIONS, open_tracking_writer, read_batches, draw_tracks
+from soccer_core.pipeline import run_sequential, run_pipelined
+from soccer_core.metrics import StageMetrics
+from soccer_core.video_io import ENCODERS, OUTPUT_MODES, open_video_writer, output_geometry, resolve_encoder
 import numpy as np
 from tqdm import tqdm
 
@@ -11,45 +18,109 @@ MODEL_PATH = os.path.join('models', 'best.pt')
 VIDEO_PATH = os.path.join('data', '15sec_input_720p.mp4')
 OUTPUT_VIDEO_PATH = os.path.join('data', 'output_broadcast_tracked.mp4')
 OUTPUT_JSON_PATH = os.path.join('data', 'tracking_broadcast.json')
+METRICS_PATH = os.path.join('data', 'metrics_broadcast.json')
 
 if __name__ == "__main__":
-    detector = PlayerDetector(MODEL_PATH)
-    tracker = PlayerTracker(max_disappeared=15)
+    parser = argparse.ArgumentParser(description='Single-camera player detection, tracking and re-ID')
+    parser.add_argument('--model', default=MODEL_PATH, help='Detector weights (.pt, or .onnx for ONNX Runtime)')
+    parser.add_argument('--detector-threads', type=int, default=None, help='Intra-op threads for the detector')
+    parser.add_argument('--batch-size', type=int, default=8, help='Frames per detector call')
+    parser.add_argument('--pipelined', action='store_true', help='Run decode, detect+track and render/encode on separate threads')
+    parser.add_argument('--queue-size', type=int, default=4, help='Max batches buffered between pipeline stages')
+    parser.add_argument('--tracker', choices=['centroid', 'hungarian', 'kalman'], default='centroid', help='Tracker backend')
+    parser.add_argument('--max-distance', type=float, default=None, help='Gate for the hungarian/kalman trackers: max centroid jump in pixels')
+    parser.add_argument('--reid', type=float, default=None, metavar='SIMILARITY', help='Give a new track the ID of a dropped track whose appearance matches with at least this cosine similarity (e.g. 0.85)')
+    parser.add_argument('--reid-ttl', type=int, default=None, help='Forget dropped tracks after this many frames (default: keep until the gallery is full)')
+    parser.add_argument('--output-mode', choices=OUTPUT_MODES, default='full', help='full: annotated video at source resolution; proxy: downscaled, lower-fps preview; data: tracking data only, no overlay or encoding')
+    parser.add_argument('--encoder', choices=ENCODERS, default='opencv', help='Video encoder: OpenCV mp4v, or an ffmpeg pipe with x264 --preset')
+    parser.add_argument('--preset', default='veryfast', help='x264 preset for --encoder ffmpeg')
+    parser.add_argument('--proxy-scale', type=float, default=0.5, help='Resolution scale of the proxy video')
+    parser.add_argument('--proxy-fps', type=float, default=10.0, help='Approximate frame rate of the proxy video')
+    parser.add_argument('--tracking-format', choices=sorted(TRACKING_EXTENSIONS), default='json', help='Tracking output: JSON list, streamed JSON Lines, or a columnar .tracks store')
+    parser.add_argument('--metrics', action='store_true', help='Write per-stage latency percentiles, queue depths and FPS to data/metrics_broadcast.json')
+    parser.add_argument('--prometheus', action='store_true', help='Also write the metrics in Prometheus text format (data/metrics_broadcast.prom)')
+    parser.add_argument('--warmup', type=int, default=0, help='Run this many dummy detector batches before the video so start-up costs stay out of the timings')
+    parser.add_argument('--imgsz', type=int, default=None, help='Detector input size (longest side); smaller is faster, default is the model\'s export/training size')
+    parser.add_argument('--roi', action='store_true', help='Run the detector only on the pitch (green-dominant region), dropping detections off the pitch')
+    parser.add_argument('--roi-refresh', type=int, default=250, help='Re-estimate the pitch mask every N detector frames')
+    parser.add_argument('--far-tiles', type=float, default=0.0, metavar='FRACTION', help='With --roi, also tile the top FRACTION of the pitch (far side) at native resolution for small players, e.g. 0.4')
+    parser.add_argument('--motion', choices=MOTION_METHODS, default=None, help='Compensate camera pans/zooms: estimate global motion on a downscaled frame (lk: sparse optical flow, orb: keypoint matching) and move the tracks with it before association')
+    args = parser.parse_args()
+    output_json_path = os.path.splitext(OUTPUT_JSON_PATH)[0] + TRACKING_EXTENSIONS[args.tracking_format]
+
+    detector = create_detector(args.model, threads=args.detector_threads, imgsz=args.imgsz)
+    if args.warmup:
+        warmup_detector(detector, batch_size=args.batch_size, runs=args.warmup)
+    if args.roi:
+        detector = RoiDetector(detector, refresh_every=args.roi_refresh, far_fraction=args.far_tiles)
+    tracker = create_tracker(args.tracker, max_disappeared=15, max_distance=args.max_distance)
+    reid = args.reid is not None
+    if reid:
+        tracker = ReIDTracker(tracker, ReIDGallery(ttl=args.reid_ttl, min_similarity=args.reid))
+    player_cls = detector.class_ids('player')
+    estimator = GlobalMotionEstimator(args.motion) if args.motion else None
+    last_boxes = None
     cap = cv2.VideoCapture(VIDEO_PATH)
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     fps = cap.get(cv2.CAP_PROP_FPS)
-    out = cv2.VideoWriter(OUTPUT_VIDEO_PATH, fourcc, fps, (width, height))
+    step, out_fps, out_size, overlay_scale = output_geometry(args.output_mode, fps, (width, height), args.proxy_scale, args.proxy_fps)
+    out = None
+    if step is not None:
+        out = open_video_writer(OUTPUT_VIDEO_PATH, out_fps, out_size, resolve_encoder(args.encoder), args.preset)
 
-    tracking_results = []
-    frame_idx = 0
+    writer = open_tracking_writer(output_json_path)
+    metrics = StageMetrics({'video': os.path.basename(VIDEO_PATH)})
     pbar = tqdm(total=int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), desc="Processing")
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        detections = detector.detect(frame)
-        player_boxes = [d['bbox'] for d in detections if d['label'].lower() == 'player']
-        objects = tracker.update(player_boxes)
-        # Draw results
-        for object_id, centroid in objects.items():
-            cv2.circle(frame, tuple(centroid), 5, (0,255,0), -1)
-            cv2.putText(frame, f'ID {object_id}', (centroid[0]-10, centroid[1]-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
-        for bbox in player_boxes:
-            x1, y1, x2, y2 = map(int, bbox)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (255,0,0), 2)
-        out.write(frame)
-        # Save tracking info
-        tracking_results.append({
-            'frame': frame_idx,
-            'objects': {str(object_id): list(map(int, centroid)) for object_id, centroid in objects.items()},
-            'boxes': [list(map(int, bbox)) for bbox in player_boxes]
-        })
-        frame_idx += 1
-        pbar.update(1)
+
+    def track(batch):
+        global last_boxes
+        with metrics.time('detect'):
+            detections = detector.detect_batch([frame for _, frame in batch])
+        results = []
+        for (frame_idx, frame), (boxes, conf, cls) in zip(batch, detections):
+            is_player = np.isin(cls, player_cls)
+            player_boxes, player_conf = boxes[is_player], conf[is_player]
+            if estimator is not None:
+                # Move the tracks with the camera before they are associated; last frame's players are masked out of the fit
+                with metrics.time('motion'):
+                    tracker.warp(estimator.estimate(frame, last_boxes))
+                last_boxes = player_boxes
+            with metrics.time('track'):
+                objects = dict(tracker.update(player_boxes, frame) if reid else tracker.update(player_boxes))
+            results.append((frame_idx, frame, objects, player_boxes, player_conf))
+        return results
+
+    def render(results):
+        for frame_idx, frame, objects, player_boxes, player_conf in results:
+            # Draw results
+            if out is not None and frame_idx % step == 0:
+                with metrics.time('overlay'):
+                    canvas = frame if overlay_scale == 1.0 else cv2.resize(frame, out_size, interpolation=cv2.INTER_AREA)
+                    draw_tracks(canvas, objects, player_boxes, overlay_scale)
+                with metrics.time('encode'):
+                    out.write(canvas)
+            # Save tracking info
+            with metrics.time('write'):
+                writer.write(frame_idx, objects, player_boxes, player_conf)
+            metrics.frame()
+            pbar.update(1)
+
+    if args.pipelined:
+        run_pipelined(read_batches(cap, args.batch_size, metrics=metrics), track, render, args.queue_size, metrics)
+    else:
+        run_sequential(read_batches(cap, args.batch_size, metrics=metrics), track, render)
     pbar.close()
     cap.release()
-    out.release()
-    save_tracking_results(tracking_results, OUTPUT_JSON_PATH)
-    print(f'[SUCCESS] Output video saved to {OUTPUT_VIDEO_PATH}')
+    if out is not None:
+        out.release()
+    writer.close()
+    metrics.finish()
+    if args.metrics or args.prometheus:
+        metrics.write_json(METRICS_PATH)
+    if args.prometheus:
+        metrics.write_prometheus(os.path.splitext(METRICS_PATH)[0] + '.prom')
+    if args.roi:
+        print(f'[INFO] Pitch ROI: detector saw {100 * detector.pixel_ratio():.0f}% of the frame pixels')
+    if out is not None:
+        print(f'[SUCCESS] Output video saved to {OUTPUT_VIDEO_PATH}')
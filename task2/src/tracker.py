@@ -1,60 +0,0 @@
-import numpy as np
-from scipy.spatial import distance as dist
-
-class PlayerTracker:
-    def __init__(self, max_disappeared=10):
-        self.next_object_id = 0
-        self.objects = dict()
-        self.disappeared = dict()
-        self.max_disappeared = max_disappeared
-
-    def register(self, centroid):
-        self.objects[self.next_object_id] = centroid
-        self.disappeared[self.next_object_id] = 0
-        self.next_object_id += 1
-
-    def deregister(self, object_id):
-        del self.objects[object_id]
-        del self.disappeared[object_id]
-
-    def update(self, detections):
-        if len(detections) == 0:
-            for object_id in list(self.disappeared.keys()):
-                self.disappeared[object_id] += 1
-                if self.disappeared[object_id] > self.max_disappeared:
-                    self.deregister(object_id)
-            return self.objects
-        input_centroids = np.zeros((len(detections), 2), dtype="int")
-        for (i, bbox) in enumerate(detections):
-            x1, y1, x2, y2 = bbox
-            cX = int((x1 + x2) / 2.0)
-            cY = int((y1 + y2) / 2.0)
-            input_centroids[i] = (cX, cY)
-        if len(self.objects) == 0:
-            for i in range(len(input_centroids)):
-                self.register(input_centroids[i])
-        else:
-            object_ids = list(self.objects.keys())
-            object_centroids = list(self.objects.values())
-            D = dist.cdist(np.array(object_centroids), input_centroids)
-            rows = D.min(axis=1).argsort()
-            cols = D.argmin(axis=1)[rows]
-            used_rows, used_cols = set(), set()
-            for (row, col) in zip(rows, cols):
-                if row in used_rows or col in used_cols:
-                    continue
-                object_id = object_ids[row]
-                self.objects[object_id] = input_centroids[col]
-                self.disappeared[object_id] = 0
-                used_rows.add(row)
-                used_cols.add(col)
-            unused_cols = set(range(0, D.shape[1])).difference(used_cols)
-            for col in unused_cols:
-                self.register(input_centroids[col])
-            unused_rows = set(range(0, D.shape[0])).difference(used_rows)
-            for row in unused_rows:
-                object_id = object_ids[row]
-                self.disappeared[object_id] += 1
-                if self.disappeared[object_id] > self.max_disappeared:
-                    self.deregister(object_id)
-        return self.objects
@@ -32,9 +32,92 @@ def ensure_required_files():
             st.success(f"Downloaded {os.path.basename(local_path)}.")
 
 ensure_required_files()
+import sys
 import cv2
 import json
-import numpy as np
+import io
+# Shared code lives in the soccer_core package at the repo root; make it importable even when not pip-installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from soccer_core.utils import find_tracking_file, open_tracking_results
+from soccer_core.frame_cache import FrameSource, keyframe_index
+from soccer_core.analytics import load_analytics, source_key
+from soccer_core.trajectories import occupancy_heatmap, simplify_tracks, viewport
+
+@st.cache_resource(max_entries=4)
+def frame_source(video_path, mtime):
+    # One capture per video, shared across reruns; mtime invalidates it when the video is rewritten. Decoded
+    # frames of all sources share one process-wide budget, and an evicted source frees its capture,
+    # read-ahead thread and frames once garbage collected
+    return FrameSource(video_path, keyframes=keyframe_index(video_path))
+
+@st.cache_data(show_spinner=False)
+def tracking_analytics(path, key):
+    # key (sizes and mtimes of the tracking output) makes Streamlit recompute when the file changes
+    return load_analytics(path)
+
+@st.cache_data(show_spinner=False)
+def simplified_tracks(path, key, zoom, center):
+    # Clipped to the view and simplified once per view and tracking file version
+    return simplify_tracks(tracking_analytics(path, key), zoom=zoom, center=center)
+
+@st.cache_data(show_spinner=False)
+def trajectory_plot(path, key, zoom=1, center=(0.5, 0.5)):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    tracks = simplified_tracks(path, key, zoom, center)
+    fig, ax = plt.subplots()
+    colors = plt.get_cmap('tab20').colors
+    ax.add_collection(LineCollection([piece for _, pieces in tracks for piece in pieces], colors=[colors[i % len(colors)] for i, (_, pieces) in enumerate(tracks) for _ in pieces], linewidths=1))
+    ax.autoscale()
+    if zoom > 1:
+        (x0, x1), (y0, y1) = viewport(tracking_analytics(path, key), zoom, center)
+        ax.set_xlim(x0, x1)
+        ax.set_ylim(y0, y1)
+    if len(tracks) <= 30:
+        handles = [plt.Line2D([], [], color=colors[i % len(colors)], label=f'ID {pid}') for i, (pid, _) in enumerate(tracks)]
+        ax.legend(handles=handles, fontsize=7, loc='upper right', bbox_to_anchor=(1.18, 1))
+    ax.set_title("Player Trajectories (Centroids)")
+    ax.set_xlabel("X")
+    ax.set_ylabel("Y")
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+    plt.close(fig)
+    return buf.getvalue()
+
+@st.cache_data(show_spinner=False)
+def heatmap_plot(path, key):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    counts, x_edges, y_edges = occupancy_heatmap(tracking_analytics(path, key))
+    fig, ax = plt.subplots()
+    ax.imshow(counts, origin='lower', extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]), aspect='auto', cmap='hot')
+    ax.set_title("Player Occupancy Heatmap")
+    ax.set_xlabel("X")
+    ax.set_ylabel("Y")
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+    plt.close(fig)
+    return buf.getvalue()
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def tracking_results(path, key):
+    # Parsed (or, for JSONL and .tracks, indexed) once per file version rather than on every slider move
+    return open_tracking_results(path)
+
+def prepare_download(key, path):
+    st.session_state[key] = path.read_bytes()
+
+def download_file(label, path):
+    # Outputs are only read when the user asks for one and dropped again once it has been handed over,
+    # so reruns never re-read or re-send whole videos
+    key = f"download:{label}:{path}"
+    if key in st.session_state:
+        st.download_button(label, st.session_state[key], file_name=path.name, key=f"{key}:button", on_click=st.session_state.pop, args=(key, None))
+    else:
+        st.button(f"Prepare {path.name} for download", key=f"{key}:prepare", on_click=prepare_download, args=(key, path))
 
 def robust_load_json(json_path):
     try:
@@ -71,7 +154,7 @@ st.markdown("""
 
 DATA_DIR = Path("data/")
 VIDEO_PATH = DATA_DIR / "output_broadcast_tracked.mp4"
-TRACKING_JSON_PATH = DATA_DIR / "tracking_broadcast.json"
+TRACKING_JSON_PATH = Path(find_tracking_file(str(DATA_DIR), "tracking_broadcast"))
 
 st.markdown("""
 This dashboard lets you:
@@ -84,61 +167,51 @@ This dashboard lets you:
 st.header("1. Tracked Output Video")
 if VIDEO_PATH.exists():
     try:
-        video_bytes = VIDEO_PATH.read_bytes()
-        st.video(video_bytes)
+        st.video(str(VIDEO_PATH))
     except Exception:
         st.error("Video could not be played in this browser. Try downloading it or using a different browser. If the file is corrupted, re-run the pipeline.")
-    st.download_button(f"Download Output Video", VIDEO_PATH.read_bytes(), file_name=VIDEO_PATH.name)
+    download_file("Download Output Video", VIDEO_PATH)
 else:
     st.warning(f"Video not found: {VIDEO_PATH}")
 
 # --- Tracking Data Viewer ---
 st.header("2. Tracking Data Explorer")
 if TRACKING_JSON_PATH.exists():
-    with open(TRACKING_JSON_PATH, "r") as f:
-        tracking_data = json.load(f)
+    tracking_data = tracking_results(str(TRACKING_JSON_PATH), source_key(str(TRACKING_JSON_PATH)))
     st.write(f"Total frames: {len(tracking_data)}")
     frame_num = st.slider("Select frame:", 0, len(tracking_data)-1, 0)
     frame_info = tracking_data[frame_num]
     st.json(frame_info)
     # Player count per frame
     st.metric("Players in frame", len(frame_info['objects']))
+    if VIDEO_PATH.exists():
+        frame = frame_source(str(VIDEO_PATH), VIDEO_PATH.stat().st_mtime).get(frame_num)
+        if frame is not None:
+            st.image(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), caption=f"Frame {frame_num}")
 else:
     st.warning(f"Tracking JSON not found: {TRACKING_JSON_PATH}")
 
 # --- Player Statistics ---
 st.header("3. Player Statistics")
 if TRACKING_JSON_PATH.exists():
-    player_counts = {}
-    for frame in tracking_data:
-        for pid in frame['objects'].keys():
-            player_counts[pid] = player_counts.get(pid, 0) + 1
-    if player_counts:
+    stats = tracking_analytics(str(TRACKING_JSON_PATH), source_key(str(TRACKING_JSON_PATH)))
+    if len(stats['ids']):
+        player_counts = dict(zip(stats['ids'].tolist(), stats['counts'].tolist()))
         st.subheader("Player Appearance Frequency (Bar Chart)")
         st.bar_chart(player_counts)
         st.markdown(f"**Total unique player IDs detected:** {len(player_counts)}")
         # Players per frame line chart
         st.subheader("Number of Players Detected Per Frame (Line Chart)")
-        players_per_frame = [len(frame['objects']) for frame in tracking_data]
-        st.line_chart(players_per_frame)
+        st.line_chart(stats['players_per_frame'])
         # Trajectory plot
         st.subheader("Player Trajectories (Centroids)")
-        import matplotlib.pyplot as plt
-        player_traj = {}
-        for frame in tracking_data:
-            for pid, centroid in frame['objects'].items():
-                if pid not in player_traj:
-                    player_traj[pid] = []
-                player_traj[pid].append(tuple(centroid))
-        fig, ax = plt.subplots()
-        for pid, traj in player_traj.items():
-            traj = np.array(traj)
-            ax.plot(traj[:,0], traj[:,1], marker='o', label=f'ID {pid}')
-        ax.set_title("Player Trajectories (Centroids)")
-        ax.set_xlabel("X")
-        ax.set_ylabel("Y")
-        ax.legend(fontsize=7, loc='upper right', bbox_to_anchor=(1.18, 1))
-        st.pyplot(fig)
+        zoom = st.select_slider("Zoom", [1, 2, 4, 8], value=1, key="traj_zoom")
+        center = (0.5, 0.5)
+        if zoom > 1:
+            center = (st.slider("Center X", 0.0, 1.0, 0.5, 0.05, key="traj_cx"), st.slider("Center Y", 0.0, 1.0, 0.5, 0.05, key="traj_cy"))
+        st.image(trajectory_plot(str(TRACKING_JSON_PATH), source_key(str(TRACKING_JSON_PATH)), zoom, center))
+        st.subheader("Player Occupancy Heatmap")
+        st.image(heatmap_plot(str(TRACKING_JSON_PATH), source_key(str(TRACKING_JSON_PATH))))
     else:
         st.info("No player data available.")
 else:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# task1 scripts import each other as top-level modules (they are run as `python src/<script>.py`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'task1', 'src'))
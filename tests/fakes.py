@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+
+class BlobDetector:
+    # Red blobs are players; works on whole frames and on ROI crops alike
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.frames = 0
+
+    def class_ids(self, label):
+        return np.array([0])
+
+    def detect_batch(self, frames):
+        self.frames += len(frames)
+        if self.fail_after is not None and self.frames > self.fail_after:
+            raise RuntimeError('simulated crash')
+        batch = []
+        for frame in frames:
+            mask = ((frame[..., 2] > 150) & (frame[..., 1] < 100)).astype(np.uint8)
+            _, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+            boxes = np.array([[x, y, x + w, y + h] for x, y, w, h, _ in stats[1:]], dtype=np.float32).reshape(-1, 4)
+            batch.append((boxes, np.ones(len(boxes), dtype=np.float32), np.zeros(len(boxes), dtype=int)))
+        return batch
+
+def write_blob_clip(path, frames=60):
+    # Grey stands with a pitch that covers the left half for the first 10 frames and the whole frame
+    # afterwards; six red "players" drift around
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 25, (320, 240))
+    rng = np.random.default_rng(0)
+    pos = rng.uniform([20, 20], [280, 200], size=(6, 2))
+    vel = rng.normal(0, 2, size=(6, 2))
+    for t in range(frames):
+        frame = np.full((240, 320, 3), 128, dtype=np.uint8)
+        frame[:, :160 if t < 10 else 320] = (40, 150, 40)
+        pos = np.clip(pos + vel, 10, [300, 220])
+        for x, y in pos.astype(int):
+            cv2.rectangle(frame, (x, y), (x + 8, y + 16), (40, 40, 220), -1)
+        out.write(frame)
+    out.release()
+    return path
@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import cv2
+import numpy as np
+import pytest
+import batch_runner
+from batch_runner import HashCache, load_manifest, plan_jobs, run_job, stamp_path
+from cross_camera_mapping import add_pipeline_arguments
+from fakes import BlobDetector
+
+def make_args(output_root, *argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output-root', default=str(output_root))
+    parser.add_argument('--force', action='store_true')
+    add_pipeline_arguments(parser)
+    return parser.parse_args(['--output-mode', 'data', '--batch-size', '4', *argv])
+
+@pytest.fixture
+def manifest(tmp_path):
+    video = tmp_path / 'videos' / 'broadcast.avi'
+    video.parent.mkdir()
+    out = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*'MJPG'), 25, (160, 120))
+    for t in range(12):
+        frame = np.full((120, 160, 3), (40, 150, 40), dtype=np.uint8)
+        cv2.rectangle(frame, (10 + 3 * t, 40), (18 + 3 * t, 56), (40, 40, 220), -1)
+        out.write(frame)
+    out.release()
+    path = tmp_path / 'manifest.json'
+    path.write_text(json.dumps({'matches': [
+        {'name': 'good', 'cameras': ['broadcast=videos/broadcast.avi']},
+        {'name': 'bad', 'cameras': ['broadcast=videos/missing.mp4']},
+    ]}))
+    return str(path)
+
+def test_unreadable_video_fails_only_its_own_job(tmp_path, manifest):
+    args = make_args(tmp_path / 'out')
+    records = []
+    jobs, pending, features, failed = plan_jobs(load_manifest(manifest), args, 1, HashCache(str(tmp_path / 'hashes.json')), 'model', records.append)
+    assert failed == 1
+    assert [(job[0], job[1]) for job in jobs] == [('good', 'broadcast')]
+    assert records[0]['match'] == 'bad' and records[0]['status'] == 'failed' and 'missing.mp4' in records[0]['error']
+    assert pending == {'good': {'broadcast'}, 'bad': set()}
+
+def test_failed_job_is_retried_and_finished_job_is_skipped(tmp_path, manifest, monkeypatch):
+    args = make_args(tmp_path / 'out')
+    matches = load_manifest(manifest)[:1]
+    hashes = HashCache(str(tmp_path / 'hashes.json'))
+    jobs, _, _, _ = plan_jobs(matches, args, 1, hashes, 'model', lambda record: None)
+
+    monkeypatch.setattr(batch_runner, '_detector', BlobDetector(fail_after=0))
+    record, features = run_job(jobs[0])
+    assert record['status'] == 'failed' and 'simulated crash' in record['error']
+    assert features is None
+    # No stamp, so the next run picks the job up again
+    assert not os.path.exists(stamp_path(str(tmp_path / 'out' / 'good'), 'broadcast'))
+    assert len(plan_jobs(matches, args, 1, hashes, 'model', lambda record: None)[0]) == 1
+
+    monkeypatch.setattr(batch_runner, '_detector', BlobDetector())
+    record, features = run_job(jobs[0])
+    assert record['status'] == 'done' and features
+    records = []
+    jobs, _, features, _ = plan_jobs(matches, args, 1, hashes, 'model', records.append)
+    assert jobs == [] and records[0]['status'] == 'skipped'
+    assert features['good']['broadcast']
+
+def test_changed_output_option_reruns_the_job(tmp_path, manifest, monkeypatch):
+    matches = load_manifest(manifest)[:1]
+    hashes = HashCache(str(tmp_path / 'hashes.json'))
+    monkeypatch.setattr(batch_runner, '_detector', BlobDetector())
+    jobs, _, _, _ = plan_jobs(matches, make_args(tmp_path / 'out'), 1, hashes, 'model', lambda record: None)
+    run_job(jobs[0])
+    assert plan_jobs(matches, make_args(tmp_path / 'out'), 1, hashes, 'model', lambda record: None)[0] == []
+    assert len(plan_jobs(matches, make_args(tmp_path / 'out', '--tracker', 'hungarian'), 1, hashes, 'model', lambda record: None)[0]) == 1
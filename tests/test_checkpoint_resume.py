@@ -0,0 +1,29 @@
+import pytest
+from cross_camera_mapping import process_video
+from soccer_core.utils import iter_tracking_results
+from fakes import BlobDetector, write_blob_clip
+
+FRAMES = 60
+
+@pytest.fixture(scope='module')
+def clip(tmp_path_factory):
+    # The pitch changes after the first frames, so an ROI mask rebuilt on resume differs from the one voted at the start
+    return write_blob_clip(str(tmp_path_factory.mktemp('clip') / 'clip.avi'), FRAMES)
+
+def run(clip, json_path, detector, **kwargs):
+    process_video(clip, None, None, str(json_path), output_mode='data', detector=detector, batch_size=4, **kwargs)
+    return list(iter_tracking_results(str(json_path)))
+
+@pytest.mark.parametrize('options', [
+    {'tracker_kind': 'centroid'},
+    {'tracker_kind': 'kalman', 'max_distance': 30, 'detect_every': 3},
+    {'tracker_kind': 'hungarian', 'roi': True, 'roi_refresh': 1000},
+    {'tracker_kind': 'centroid', 'motion': 'lk'},
+], ids=['centroid', 'kalman-skipping', 'roi', 'motion'])
+def test_resume_matches_uninterrupted_run(clip, tmp_path, options):
+    expected = run(clip, tmp_path / 'full.json', BlobDetector(), **options)
+    with pytest.raises(RuntimeError):
+        run(clip, tmp_path / 'resumed.json', BlobDetector(fail_after=12), checkpoint_every=8, **options)
+    resumed = run(clip, tmp_path / 'resumed.json', BlobDetector(), checkpoint_every=8, resume=True, **options)
+    assert len(resumed) == FRAMES
+    assert resumed == expected
@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+import pytest
+from player_mapper import FeatureAccumulator
+from soccer_core.feature_extractor import extract_color_histogram, extract_color_histograms
+from soccer_core.tracker import assign_boxes
+
+def two_player_frame():
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    frame[:] = (40, 140, 40)
+    frame[20:60, 20:40] = (255, 255, 255)
+    frame[20:60, 120:140] = (40, 40, 200)
+    return frame
+
+def test_boxes_are_paired_by_position_not_order():
+    white, red = np.array([20, 20, 40, 60.0]), np.array([120, 20, 140, 60.0])
+    # Track 0 is the white player, 1 the red one, 2 is coasting with no detection this frame;
+    # the detector returns red first (e.g. by confidence)
+    objects = {0: (30, 40), 1: (130, 40), 2: (80, 90)}
+    ids, cols = assign_boxes(objects, np.stack([red, white]))
+    assert dict(zip(ids, cols.tolist())) == {0: 1, 1: 0}
+
+def test_add_frame_attributes_histograms_to_the_right_ids():
+    frame = two_player_frame()
+    white, red = [20, 20, 40, 60], [120, 20, 140, 60]
+    features = FeatureAccumulator()
+    features.add_frame(frame, {'0': [30, 40], '1': [130, 40], '2': [80, 90]}, [red, white])
+    means = features.means()
+    assert set(means) == {'0', '1'}
+    assert np.allclose(means['0'], extract_color_histogram(frame, white))
+    assert np.allclose(means['1'], extract_color_histogram(frame, red))
+
+def per_box_histogram(frame, bbox, bins=(8, 8, 8)):
+    # One crop, one cvtColor and one calcHist per box, as before batching
+    x1, y1, x2, y2 = map(int, bbox)
+    hsv = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1, 2], None, bins, [0, 180, 0, 256, 0, 256])
+    cv2.normalize(hist, hist)
+    return hist.flatten()
+
+@pytest.mark.parametrize('chunk', [256, 3])
+def test_batch_histograms_match_per_box_histograms(chunk):
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=(120, 200, 3), dtype=np.uint8)
+    x1, y1 = rng.integers(0, 150, size=10), rng.integers(0, 80, size=10)
+    boxes = np.column_stack([x1, y1, x1 + rng.integers(1, 50, size=10), y1 + rng.integers(1, 40, size=10)])
+    hists = extract_color_histograms(frame, boxes, chunk=chunk)
+    assert hists.shape == (10, 512)
+    for box, hist in zip(boxes, hists):
+        assert np.allclose(hist, per_box_histogram(frame, box), atol=1e-6)
+
+def test_batch_histograms_clip_boxes_and_zero_empty_ones():
+    frame = two_player_frame()
+    hists = extract_color_histograms(frame, [[-10, -10, 40, 60], [150, 50, 150, 80], [300, 10, 320, 30], [190, 90, 250, 150]])
+    assert np.allclose(hists[0], per_box_histogram(frame, [0, 0, 40, 60]), atol=1e-6)
+    assert not hists[1].any() and not hists[2].any()
+    assert np.allclose(hists[3], per_box_histogram(frame, [190, 90, 200, 100]), atol=1e-6)
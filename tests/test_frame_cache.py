@@ -0,0 +1,48 @@
+import gc
+import time
+import cv2
+import numpy as np
+import pytest
+from soccer_core.frame_cache import FrameCache, FrameSource
+
+@pytest.fixture
+def clip(tmp_path):
+    path = str(tmp_path / 'clip.avi')
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 25, (64, 48))
+    for i in range(40):
+        out.write(np.full((48, 64, 3), i * 5, dtype=np.uint8))
+    out.release()
+    return path
+
+def test_frames_are_served_in_order_and_read_ahead(clip):
+    source = FrameSource(clip, cache=FrameCache(), read_ahead=4)
+    assert abs(int(source.get(10)[0, 0, 0]) - 50) <= 3
+    deadline = time.monotonic() + 2
+    while (source.token, 14) not in source.cache and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert (source.token, 14) in source.cache
+    source.close()
+    assert source.get(20) is None
+    assert source.cache.nbytes == 0
+
+def test_budget_is_shared_across_sources(clip):
+    frame_bytes = 64 * 48 * 3
+    cache = FrameCache(budget_bytes=10 * frame_bytes)
+    a, b = FrameSource(clip, cache=cache, read_ahead=0), FrameSource(clip, cache=cache, read_ahead=0)
+    for i in range(8):
+        a.get(i)
+        b.get(i)
+    assert cache.nbytes <= 10 * frame_bytes
+    a.close()
+    b.close()
+
+def test_unreferenced_source_stops_its_thread_and_frees_frames(clip):
+    cache = FrameCache()
+    source = FrameSource(clip, cache=cache, read_ahead=4)
+    source.get(0)
+    worker = source._worker
+    del source
+    gc.collect()
+    worker.join(timeout=3)
+    assert not worker.is_alive()
+    assert cache.nbytes == 0
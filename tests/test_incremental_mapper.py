@@ -0,0 +1,41 @@
+import numpy as np
+from player_mapper import IncrementalMapper
+
+def hist(k, bins=8):
+    h = np.full(bins, 0.01, dtype=np.float32)
+    h[k] = 1.0
+    return h / h.sum()
+
+def test_maps_and_keeps_stable_pairs():
+    mapper = IncrementalMapper()
+    reference = {'1': hist(0), '2': hist(3)}
+    changes = mapper.update(reference, {'x': hist(0), 'y': hist(3)})
+    assert mapper.mapping == {'x': '1', 'y': '2'}
+    assert {c['id'] for c in changes} == {'x', 'y'}
+    assert mapper.update(reference, {'x': hist(0), 'y': hist(3)}) == []
+
+def test_ids_leaving_the_window_are_unmapped():
+    mapper = IncrementalMapper()
+    reference = {'1': hist(0), '2': hist(3)}
+    mapper.update(reference, {'x': hist(0)})
+    # x left the window and y now looks like reference 1: x must be released, not left pointing at 1
+    changes = mapper.update(reference, {'y': hist(0)})
+    assert mapper.mapping == {'y': '1'}
+    assert {'id': 'x', 'reference_id': None} in changes
+    assert any(c['id'] == 'y' and c['reference_id'] == '1' for c in changes)
+
+def test_empty_window_unmaps_everything():
+    mapper = IncrementalMapper()
+    mapper.update({'1': hist(0)}, {'x': hist(0)})
+    assert mapper.update({'1': hist(0)}, {}) == [{'id': 'x', 'reference_id': None}]
+    assert mapper.mapping == {}
+
+def test_live_mapping_creates_the_data_dir(tmp_path):
+    import queue
+    from concurrent.futures import Future
+    from cross_camera_mapping import stream_live_mapping
+    done = Future()
+    done.set_result(None)
+    data_dir = tmp_path / 'fresh'
+    stream_live_mapping([done], queue.Queue(), ['broadcast', 'tacticam'], str(data_dir), 'l2', None)
+    assert (data_dir / 'tacticam_to_broadcast_mapping_updates.jsonl').exists()
@@ -0,0 +1,35 @@
+import types
+import pytest
+
+ort = pytest.importorskip('onnxruntime')
+from soccer_core.onnx_detector import OnnxPlayerDetector
+
+class FakeSession:
+    # Just enough of an InferenceSession for the constructor
+    shape = [1, 3, 640, 640]
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_inputs(self):
+        return [types.SimpleNamespace(name='images', shape=self.shape)]
+
+    def get_modelmeta(self):
+        return types.SimpleNamespace(custom_metadata_map={'names': "{0: 'player'}", 'imgsz': '[640, 640]'})
+
+class DynamicSession(FakeSession):
+    shape = ['batch', 3, 'height', 'width']
+
+@pytest.mark.parametrize('imgsz', [None, 640, 630])
+def test_fixed_shape_model_accepts_its_own_size(monkeypatch, imgsz):
+    monkeypatch.setattr(ort, 'InferenceSession', FakeSession)
+    assert OnnxPlayerDetector('model.onnx', imgsz=imgsz).imgsz == 640
+
+def test_fixed_shape_model_rejects_another_size(monkeypatch):
+    monkeypatch.setattr(ort, 'InferenceSession', FakeSession)
+    with pytest.raises(ValueError, match='fixed 640px'):
+        OnnxPlayerDetector('model.onnx', imgsz=960)
+
+def test_dynamic_model_rounds_to_the_stride(monkeypatch):
+    monkeypatch.setattr(ort, 'InferenceSession', DynamicSession)
+    assert OnnxPlayerDetector('model.onnx', imgsz=1000).imgsz == 1024
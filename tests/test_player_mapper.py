@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+import pytest
+from player_mapper import cost_matrix, map_players, match_confidence, match_players
+
+def features(rows, prefix):
+    return {f'{prefix}{i}': np.asarray(row, dtype=float) for i, row in enumerate(rows)}
+
+@pytest.mark.parametrize('metric', ['l2', 'cosine', 'bhattacharyya', 'chi2'])
+def test_cost_matrix_matches_pairwise_distances(metric):
+    rng = np.random.default_rng(0)
+    a, b = features(rng.random((4, 16)), 'a'), features(rng.random((3, 16)), 'b')
+    ids_a, ids_b, cost = cost_matrix(a, b, metric)
+    assert (ids_a, ids_b) == (list(a), list(b))
+    for i, ida in enumerate(ids_a):
+        for j, idb in enumerate(ids_b):
+            p, q = a[ida], b[idb]
+            if metric == 'l2':
+                expected = np.linalg.norm(p - q)
+            elif metric == 'cosine':
+                expected = 1 - p @ q / (np.linalg.norm(p) * np.linalg.norm(q))
+            elif metric == 'bhattacharyya':
+                expected = cv2.compareHist(p.astype(np.float32), q.astype(np.float32), cv2.HISTCMP_BHATTACHARYYA)
+            else:
+                p, q = p / p.sum(), q / q.sum()
+                expected = 0.5 * np.sum((p - q) ** 2 / (p + q))
+            assert cost[i, j] == pytest.approx(expected, abs=1e-5)
+
+def test_pairs_beyond_max_cost_stay_unmatched():
+    a = features([[0, 0], [10, 0], [0, 10]], 'a')
+    # b0 is next to a1, b1 next to a0, b2 is far from everything
+    b = features([[10, 1], [1, 0], [50, 50]], 'b')
+    assert map_players(a, b) == {'b0': 'a1', 'b1': 'a0', 'b2': 'a2'}
+    for split in (True, False):
+        assert map_players(a, b, max_cost=2.0, split=split) == {'b0': 'a1', 'b1': 'a0'}
+    assert match_players(a, b, max_cost=0.5) == []
+
+def test_gating_does_not_steal_a_feasible_partner():
+    # Unconstrained, the cheapest total pairs a0-b1 and a1-b0; with a1-b0 gated out a0 must still take b0
+    a = features([[0.0], [3.0]], 'a')
+    b = features([[1.0], [2.5]], 'b')
+    assert map_players(a, b, max_cost=1.2) == {'b0': 'a0', 'b1': 'a1'}
+    assert map_players(a, b, max_cost=0.8) == {'b1': 'a1'}
+
+def test_confidence_is_one_minus_the_cost_ratio_to_the_runner_up():
+    a = features([[0.0], [10.0]], 'a')
+    b = features([[1.0], [6.0]], 'b')
+    matches = {m['id']: m for m in match_players(a, b)}
+    assert matches['b0']['reference_id'] == 'a0' and matches['b0']['cost'] == pytest.approx(1.0)
+    # b0's runner-up is a1 (cost 9), a0's is b1 (cost 6): the closer one decides
+    assert matches['b0']['confidence'] == pytest.approx(1 - 1 / 6)
+    # a1-b1 costs 4; b1's runner-up is a0 (cost 6), a1's is b0 (cost 9)
+    assert matches['b1']['confidence'] == pytest.approx(1 - 4 / 6)
+
+def test_unambiguous_and_tied_confidences():
+    assert match_players(features([[0.0]], 'a'), features([[3.0]], 'b'))[0]['confidence'] == 1.0
+    tied = match_players(features([[0.0], [2.0]], 'a'), features([[1.0]], 'b'))
+    assert tied[0]['confidence'] == pytest.approx(0.0)
+    assert match_confidence(np.zeros((0, 0)), np.zeros(0, int), np.zeros(0, int)).size == 0
+
+def test_empty_sides_match_nothing():
+    assert match_players({}, features([[1.0]], 'b')) == []
+    assert match_players(features([[1.0]], 'a'), {}) == []
@@ -0,0 +1,64 @@
+import numpy as np
+from soccer_core.track_store import TrackStore, TrackStoreWriter, json_to_store, store_to_json
+from soccer_core.utils import iter_tracking_results, open_tracking_writer, tracking_record
+
+def frames(n=10):
+    # Track 1 is always there, track 2 from frame 3 on, and frame 5 has no detections at all
+    for i in range(n):
+        objects = {1: (10 + i, 20)}
+        if i >= 3:
+            objects[2] = (100, 50 + i)
+        if i == 5:
+            objects = {}
+        boxes = [[x - 4, y - 8, x + 4, y + 8] for x, y in objects.values()]
+        yield i, objects, boxes
+
+def write_store(path, records, **kwargs):
+    writer = TrackStoreWriter(str(path), **kwargs)
+    for frame_idx, objects, boxes in records:
+        writer.write(frame_idx, objects, boxes, conf=np.full(len(boxes), 0.5))
+    writer.close()
+    return str(path)
+
+def test_store_round_trips_every_frame(tmp_path):
+    path = write_store(tmp_path / 'clip.tracks', frames(), buffer_frames=3)
+    store = TrackStore(path)
+    assert len(store) == 10
+    assert list(store) == [tracking_record(*record) for record in frames()]
+    assert store[5] == {'frame': 5, 'objects': {}, 'boxes': []}
+
+def test_store_reads_frame_ranges_and_tracks(tmp_path):
+    store = TrackStore(write_store(tmp_path / 'clip.tracks', frames()))
+    objects, boxes = store.frame_range(2, 5)
+    assert objects['frame'].tolist() == [2, 3, 3, 4, 4]
+    assert len(boxes) == 5 and np.allclose(boxes['conf'], 0.5)
+    assert len(store.frame_range(20, 30)[0]) == 0
+    track = store.track(2)
+    assert track['frame'].tolist() == [3, 4, 6, 7, 8, 9]
+    assert track['cy'].tolist() == [53, 54, 56, 57, 58, 59]
+
+def test_store_converts_to_and_from_json(tmp_path):
+    json_path = str(tmp_path / 'clip.json')
+    writer = open_tracking_writer(json_path)
+    for record in frames():
+        writer.write(*record)
+    writer.close()
+    json_to_store(json_path, str(tmp_path / 'clip.tracks'))
+    store_to_json(str(tmp_path / 'clip.tracks'), str(tmp_path / 'back.json'))
+    assert list(iter_tracking_results(str(tmp_path / 'back.json'))) == list(iter_tracking_results(json_path))
+
+def test_resumed_writer_drops_frames_after_the_checkpoint(tmp_path):
+    path = str(tmp_path / 'clip.tracks')
+    records = list(frames())
+    writer = TrackStoreWriter(path)
+    for record in records[:4]:
+        writer.write(*record)
+    state = writer.state()
+    # Written after the checkpoint, then lost in a crash
+    writer.write(99, {7: (0, 0)}, [[0, 0, 1, 1]])
+    writer.flush()
+    writer = TrackStoreWriter(path, resume=state)
+    for record in records[4:]:
+        writer.write(*record)
+    writer.close()
+    assert list(TrackStore(path)) == [tracking_record(*record) for record in records]
@@ -0,0 +1,28 @@
+import pytest
+from cross_camera_mapping import process_video
+from soccer_core.utils import iter_tracking_results
+from fakes import BlobDetector, write_blob_clip
+
+@pytest.fixture(scope='module')
+def clip(tmp_path_factory):
+    return write_blob_clip(str(tmp_path_factory.mktemp('clip') / 'clip.avi'), 40)
+
+@pytest.mark.parametrize('tracker_kind', ['centroid', 'hungarian', 'kalman'])
+def test_tracking_output_does_not_depend_on_batch_size(clip, tmp_path, tracker_kind):
+    # Frames of a batch are tracked before any of them is written, so centroids handed out for one
+    # frame must not change when the tracker moves on to the next
+    outputs = []
+    for batch_size in (1, 4):
+        path = str(tmp_path / f'tracking_{batch_size}.json')
+        process_video(clip, None, None, path, output_mode='data', detector=BlobDetector(), batch_size=batch_size, tracker_kind=tracker_kind)
+        outputs.append(list(iter_tracking_results(path)))
+    assert outputs[0] == outputs[1]
+
+def test_max_uncertainty_skips_detection_without_detect_every(clip, tmp_path):
+    detector = BlobDetector()
+    process_video(clip, None, None, str(tmp_path / 'tracking.json'), output_mode='data', detector=detector, batch_size=4, tracker_kind='kalman', max_distance=30, max_uncertainty=8)
+    assert 0 < detector.frames < 40
+
+def test_max_uncertainty_with_detect_every_one_is_rejected(clip, tmp_path):
+    with pytest.raises(ValueError):
+        process_video(clip, None, None, str(tmp_path / 'tracking.json'), output_mode='data', detector=BlobDetector(), tracker_kind='kalman', detect_every=1, max_uncertainty=8)
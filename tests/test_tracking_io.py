@@ -0,0 +1,50 @@
+import json
+import pytest
+from soccer_core.utils import JsonlTrackingReader, iter_tracking_results, open_tracking_results, open_tracking_writer, tracking_record
+
+def frames(n=7):
+    for i in range(n):
+        objects = {} if i == 2 else {3: (i, 2 * i), 8: (50, 60)}
+        yield i, objects, [[x - 1, y - 1, x + 1, y + 1] for x, y in objects.values()]
+
+def write(path, records, **kwargs):
+    writer = open_tracking_writer(str(path), **kwargs)
+    for record in records:
+        writer.write(*record)
+    writer.close()
+    return str(path)
+
+@pytest.mark.parametrize('name', ['clip.jsonl', 'clip.json'])
+def test_streamed_results_round_trip(tmp_path, name):
+    path = write(tmp_path / 'out' / name, frames(), buffer_frames=2)
+    expected = [tracking_record(*record) for record in frames()]
+    assert list(iter_tracking_results(path)) == expected
+    assert list(open_tracking_results(path)) == expected
+
+def test_json_writer_matches_the_legacy_format(tmp_path):
+    path = write(tmp_path / 'clip.json', frames(), buffer_frames=3)
+    with open(path) as f:
+        assert json.load(f) == [tracking_record(*record) for record in frames()]
+
+def test_jsonl_reader_indexes_frames(tmp_path):
+    path = write(tmp_path / 'clip.jsonl', frames())
+    reader = open_tracking_results(path)
+    assert isinstance(reader, JsonlTrackingReader)
+    assert len(reader) == 7
+    assert reader[4] == tracking_record(*list(frames())[4])
+    assert reader[2]['objects'] == {}
+    assert list(reader) == [tracking_record(*record) for record in frames()]
+
+@pytest.mark.parametrize('name', ['clip.jsonl', 'clip.json'])
+def test_resumed_writer_drops_frames_after_the_checkpoint(tmp_path, name):
+    path = str(tmp_path / name)
+    records = list(frames())
+    writer = open_tracking_writer(path)
+    for record in records[:3]:
+        writer.write(*record)
+    state = writer.state()
+    writer.write(99, {1: (0, 0)}, [])
+    writer.flush()
+    writer.file.close()
+    write(path, records[3:], resume=state)
+    assert list(iter_tracking_results(path)) == [tracking_record(*record) for record in records]
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from soccer_core.trajectories import rdp, simplify_tracks, viewport
+
+def reference_rdp(points, tolerance):
+    # The textbook recursive version
+    keep = {0, len(points) - 1}
+    def split(lo, hi):
+        if hi - lo < 2:
+            return
+        seg, rel = points[hi] - points[lo], points[lo + 1:hi] - points[lo]
+        length = np.hypot(*seg)
+        dists = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / length if length else np.hypot(rel[:, 0], rel[:, 1])
+        i = int(np.argmax(dists))
+        if dists[i] > tolerance:
+            keep.add(lo + 1 + i)
+            split(lo, lo + 1 + i)
+            split(lo + 1 + i, hi)
+    split(0, len(points) - 1)
+    return np.array(sorted(keep))
+
+def walk(n, seed):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(0, 1, size=(n, 2)), axis=0)
+
+def analytics_for(tracks):
+    xy = np.concatenate(tracks)
+    return {'ids': np.arange(len(tracks)), 'traj_offsets': np.cumsum([0] + [len(t) for t in tracks]),
+            'traj_x': xy[:, 0], 'traj_y': xy[:, 1], 'traj_frame': np.concatenate([np.arange(len(t)) for t in tracks])}
+
+def distance_to_polyline(points, line):
+    a, b = line[:-1], line[1:]
+    ab = b - a
+    t = np.clip(np.einsum('pkd,kd->pk', points[:, None] - a, ab) / np.maximum((ab ** 2).sum(1), 1e-12), 0, 1)
+    closest = a + t[..., None] * ab
+    return np.linalg.norm(points[:, None] - closest, axis=2).min(axis=1)
+
+@pytest.mark.parametrize('tolerance', [0.5, 2.0, 8.0])
+def test_rdp_keeps_the_same_vertices_as_the_recursive_version(tolerance):
+    points = walk(500, 1)
+    assert np.array_equal(rdp(points, tolerance), reference_rdp(points, tolerance))
+
+def test_rdp_keeps_fixed_vertices():
+    points = walk(200, 2)
+    assert {50, 120} <= set(rdp(points, 1e6, fixed=[50, 120]).tolist())
+
+def test_simplified_tracks_stay_within_tolerance():
+    tracks = [walk(400, seed) for seed in range(5)]
+    analytics = analytics_for(tracks)
+    simplified = simplify_tracks(analytics, tolerance_px=1.0, width_px=640)
+    tolerance = np.ptp(analytics['traj_x']) / 640
+    assert [track_id for track_id, _ in simplified] == [str(i) for i in range(5)]
+    for original, (_, pieces) in zip(tracks, simplified):
+        assert len(pieces) == 1 and len(pieces[0]) < len(original)
+        assert distance_to_polyline(original, pieces[0]).max() <= tolerance
+
+def test_zoomed_tracks_are_clipped_to_the_view():
+    inside = np.column_stack([np.linspace(0, 100, 200), np.full(200, 50.0)])
+    crossing = np.column_stack([np.full(200, 50.0), np.linspace(0, 100, 200)])
+    # Passes through the view on the way up, on the way down and at the end, so it is cut in three
+    looping = np.column_stack([np.full(300, 5.0), 50 + 45 * np.sin(np.linspace(0, 2 * np.pi, 300))])
+    analytics = analytics_for([inside, crossing, looping])
+    view = viewport(analytics, zoom=4, center=(0.5, 0.5))
+    (x0, x1), (y0, y1) = view
+    tracks = dict(simplify_tracks(analytics, zoom=4, center=(0.5, 0.5)))
+    assert set(tracks) == {'0', '1'}
+    for piece in tracks['0'] + tracks['1']:
+        # Only the last points on either side of the border may lie outside it
+        outside = (piece[:, 0] < x0) | (piece[:, 0] > x1) | (piece[:, 1] < y0) | (piece[:, 1] > y1)
+        assert not outside[1:-1].any()
+    far = dict(simplify_tracks(analytics, zoom=4, center=(0.05, 0.5)))
+    assert len(far['2']) == 3
@@ -0,0 +1,21 @@
+import shutil
+import cv2
+import numpy as np
+import pytest
+from soccer_core.video_io import FfmpegVideoWriter, output_geometry
+
+def test_proxy_sizes_are_even():
+    step, fps, size, scale = output_geometry('proxy', 25.0, (1279, 719), proxy_scale=0.5, proxy_fps=10.0)
+    assert step == 2 and fps == 12.5
+    assert size[0] % 2 == 0 and size[1] % 2 == 0
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='needs ffmpeg')
+def test_ffmpeg_writer_pads_odd_frame_sizes(tmp_path):
+    path = str(tmp_path / 'odd.mp4')
+    writer = FfmpegVideoWriter(path, 25, (321, 241))
+    for i in range(5):
+        writer.write(np.full((241, 321, 3), 40 * i, dtype=np.uint8))
+    writer.release()
+    cap = cv2.VideoCapture(path)
+    assert (cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (322, 242)
+    cap.release()